@@ -0,0 +1,269 @@
+"""
+Built-in Teil configurations, kept as Python literals so a default install
+needs no YAML parsing. config/teil/teilN.yaml overrides the entry for Teil N.
+"""
+
+DEFAULTS = {
+    1: {
+        'name': 'Teil 1 - Short Monologues',
+        'description': 'Five short texts with multiple choice questions',
+        
+        'timing': {
+            # Core timing
+            'thinking_time': 5.0,          # User preference: shortened from 25s
+            'pause_between_plays': 3.0,    # Pause between first and second play
+            'transition_duration': 2.5,    # Minimum transition time
+            'answer_reveal_pause': 2.0,    # Pause after showing answer
+            
+            # Section-specific timing
+            'intro_duration': 15.0,        # Max intro duration
+            'instructions_pause': 1.0,     # Pause after instructions
+            'outro_duration': 15.0,        # Max outro duration
+            
+            # Task-specific
+            'task_setup_pause': 0.5,       # Brief pause before text starts
+            'question_to_answer_pause': 1.0  # Pause between question and answer reveal
+        },
+        
+        'audio': {
+            # Playback settings
+            'text_play_count': 2,           # Play each text twice
+            'question_play_count': 1,       # Play questions once
+            'instruction_play_count': 1,    # Play instructions once
+            
+            # Voice preferences by role
+            'voice_preferences': {
+                'instructor': {'gender': 'female', 'primary_voice': 'Marlene'},
+                'service_provider': {'gender': 'mixed', 'distribution': 'balanced'},
+                'customer': {'gender': 'mixed', 'distribution': 'balanced'},
+                'announcer': {'gender': 'female', 'primary_voice': 'Vicki'}
+            },
+            
+            # Engine preferences
+            'engine_hierarchy': ['generative', 'neural', 'standard'],
+            'fallback_strategy': 'cascade',
+            
+            # Audio processing
+            'sample_rate': '22050',
+            'format': 'mp3',
+            'normalize_volume': True
+        },
+        
+        'visual': {
+            # Template settings
+            'base_template': 'teil1_base.html',
+            'default_theme': 'energetic',
+            'available_themes': ['energetic', 'professional', 'minimalist', 'german'],
+            
+            # Display settings
+            'show_question_numbers': True,
+            'show_progress_bar': True,
+            'show_timer': False,           # No timer for non-exam mode
+            'transition_animations': True,
+            
+            # Layout
+            'content_display_mode': 'combined',  # Text + question together
+            'answer_reveal_mode': 'immediate',   # Show answer right after thinking time
+            
+            # Visual elements
+            'background_style': 'gradient',
+            'font_size': 'medium',
+            'contrast_mode': 'normal'
+        },
+        
+        'structure': {
+            # Content organization
+            'sections': [
+                {'type': 'intro', 'required': True},
+                {'type': 'instructions', 'required': True},
+                {'type': 'combined_tasks', 'count': 5, 'required': True},
+                {'type': 'outro', 'required': True}
+            ],
+            
+            # Task structure
+            'task_pattern': [
+                'transition',
+                'combined_task',  # Text (2x) + Question + Thinking
+                'answer_reveal'
+            ],
+            
+            # Content requirements
+            'text_length_range': [30, 40],     # Words
+            'question_options': 3,             # a, b, c
+            'required_contexts': [             # Ensure variety
+                'service_announcement',
+                'business_message', 
+                'public_announcement',
+                'personal_message',
+                'weather_news'
+            ]
+        },
+        
+        'educational': {
+            # Learning objectives
+            'skill_focus': 'basic_comprehension',
+            'cefr_level': 'A2',
+            'vocabulary_complexity': 'everyday',
+            
+            # Assessment
+            'passing_score': 0.6,              # 60% for A2
+            'feedback_mode': 'immediate',       # Show answers immediately
+            'mistake_analysis': False,          # Keep simple for A2
+            
+            # Adaptation
+            'difficulty_adaptive': False,      # Fixed A2 level
+            'speed_options': ['normal'],       # No speed variation for now
+            'repeat_options': True             # Allow replay
+        }
+    },
+    
+    2: {
+        'name': 'Teil 2 - Long Conversation + Visual Questions',
+        'description': 'One long conversation followed by visual multiple choice',
+        
+        'timing': {
+            'thinking_time': 20.0,          # Longer for complex content
+            'conversation_play_count': 1,   # Play once only
+            'visual_question_time': 25.0,   # Time to examine images
+            'transition_duration': 3.0,
+            'answer_reveal_pause': 3.0
+        },
+        
+        'audio': {
+            'conversation_play_count': 1,
+            'question_play_count': 1,
+            'dialogue_pause_between_speakers': 0.4,
+            'natural_conversation_flow': True,
+            
+            'voice_preferences': {
+                'dialogue_speakers': {'gender': 'mixed', 'distinct_voices': True},
+                'instructor': {'gender': 'female', 'primary_voice': 'Marlene'}
+            }
+        },
+        
+        'visual': {
+            'base_template': 'teil2_visual.html',
+            'default_theme': 'professional',  # Better for visual questions
+            'image_display_mode': 'large',
+            'question_layout': 'visual_grid',
+            'show_conversation_transcript': False  # Audio only
+        },
+        
+        'structure': {
+            'sections': [
+                {'type': 'intro', 'required': True},
+                {'type': 'instructions', 'required': True},
+                {'type': 'conversation', 'length': '2-3 minutes', 'required': True},
+                {'type': 'visual_questions', 'count': 5, 'required': True},
+                {'type': 'outro', 'required': True}
+            ],
+            
+            'conversation_structure': {
+                'min_exchanges': 15,
+                'max_duration': 180,  # 3 minutes max
+                'speaker_count': 2,
+                'context_types': ['apartment_search', 'service_inquiry', 'planning_meeting']
+            }
+        }
+    },
+    
+    3: {
+        'name': 'Teil 3 - Short Dialogues + Visual Questions',
+        'description': 'Five short conversations with visual answers',
+        
+        'timing': {
+            'thinking_time': 15.0,           # Medium length
+            'dialogue_play_count': 2,        # Play twice like Teil 1
+            'pause_between_plays': 3.0,
+            'visual_question_time': 20.0,
+            'transition_duration': 2.5
+        },
+        
+        'audio': {
+            'dialogue_play_count': 2,
+            'short_conversation_length': [30, 45],  # Seconds
+            'speaker_variety': True,          # Different speakers per dialogue
+            
+            'voice_preferences': {
+                'dialogue_speakers': {'gender': 'mixed', 'rotation': 'balanced'},
+                'service_contexts': ['shop', 'restaurant', 'office', 'public_space']
+            }
+        },
+        
+        'visual': {
+            'base_template': 'teil3_visual.html',
+            'default_theme': 'minimalist',    # Clean for multiple dialogues
+            'image_display_mode': 'medium',
+            'dialogue_counter': True,
+            'context_indicators': True        # Show where conversation happens
+        },
+        
+        'structure': {
+            'sections': [
+                {'type': 'intro', 'required': True},
+                {'type': 'instructions', 'required': True},
+                {'type': 'short_dialogues', 'count': 5, 'required': True},
+                {'type': 'outro', 'required': True}
+            ],
+            
+            'dialogue_pattern': [
+                'dialogue_intro',
+                'short_dialogue',  # 2x play
+                'visual_question',
+                'answer_reveal'
+            ]
+        }
+    },
+    
+    4: {
+        'name': 'Teil 4 - Interview + Text Questions',
+        'description': 'Long interview with traditional text-based questions',
+        
+        'timing': {
+            'thinking_time': 30.0,           # Longest for complex analysis
+            'interview_play_count': 1,       # Single play only
+            'question_spacing': 15.0,        # Time between questions
+            'analysis_time': 45.0,           # Time to process interview
+            'transition_duration': 3.0
+        },
+        
+        'audio': {
+            'interview_play_count': 1,
+            'interview_length': [240, 300],  # 4-5 minutes
+            'question_play_count': 1,
+            'complex_vocabulary': True,
+            
+            'voice_preferences': {
+                'interviewer': {'gender': 'female', 'professional_tone': True},
+                'interviewee': {'gender': 'mixed', 'natural_speech': True},
+                'instructor': {'gender': 'female', 'clear_diction': True}
+            }
+        },
+        
+        'visual': {
+            'base_template': 'teil4_interview.html',
+            'default_theme': 'professional',  # Serious tone for interviews
+            'show_interview_progress': True,
+            'question_display_mode': 'text_focus',
+            'background_complexity': 'minimal'  # Keep focus on content
+        },
+        
+        'structure': {
+            'sections': [
+                {'type': 'intro', 'required': True},
+                {'type': 'instructions', 'required': True},
+                {'type': 'interview', 'length': '4-5 minutes', 'required': True},
+                {'type': 'processing_time', 'duration': 45, 'required': True},
+                {'type': 'text_questions', 'count': 8, 'required': True},
+                {'type': 'outro', 'required': True}
+            ],
+            
+            'interview_structure': {
+                'topic_complexity': 'personal_experience',
+                'vocabulary_level': 'B1_bridge',  # Slightly harder
+                'speech_rate': 'natural',
+                'accent_variety': 'standard_german'
+            }
+        }
+    }
+}
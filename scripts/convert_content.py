@@ -182,6 +182,21 @@ def convert_teil1_user_to_production(user_data):
     
     return production_data
 
+def convert_user_to_production_data(user_data):
+    """
+    Convert parsed user JSON to production data without touching disk.
+    Returns None if the Teil has no converter yet.
+    """
+    
+    # Determine format and convert accordingly
+    teil = user_data.get('exam_info', {}).get('teil', 1)
+    
+    if teil == 1:
+        return convert_teil1_user_to_production(user_data)
+    
+    print(f"❌ Teil {teil} conversion not yet implemented")
+    return None
+
 def convert_user_to_production(user_json_path):
     """Main conversion function with gender enhancement"""
     
@@ -204,13 +219,8 @@ def convert_user_to_production(user_json_path):
         with open(user_json_path, 'r', encoding='utf-8') as f:
             user_data = json.load(f)
         
-        # Determine format and convert accordingly
-        teil = user_data.get('exam_info', {}).get('teil', 1)
-        
-        if teil == 1:
-            production_data = convert_teil1_user_to_production(user_data)
-        else:
-            print(f"❌ Teil {teil} conversion not yet implemented")
+        production_data = convert_user_to_production_data(user_data)
+        if production_data is None:
             return False
         
         # Generate output filename
@@ -242,8 +252,11 @@ def convert_user_to_production(user_json_path):
         print(f"❌ Conversion error: {e}")
         return False
 
-def main():
-    if len(sys.argv) != 2:
+def main(argv=None):
+    if argv is None:
+        argv = sys.argv[1:]
+    
+    if len(argv) != 1:
         print("❌ Usage: python convert_content.py <user_json_file>")
         print("🔍 Supported formats:")
         print("   - Teil 1: Combined display with transitions")
@@ -253,23 +266,24 @@ def main():
         print("📁 Allowed directories:")
         for directory in ALLOWED_INPUT_DIRS:
             print(f"   - {directory}")
-        sys.exit(1)
+        return 1
     
-    user_json_path = sys.argv[1]
+    user_json_path = argv[0]
     
     # Security check
     dangerous_patterns = ['../', '..\\', '/etc/', '/proc/', 'C:\\', 'system32']
     if any(pattern in user_json_path for pattern in dangerous_patterns):
         print(f"❌ Potentially unsafe path detected: {user_json_path}")
-        sys.exit(1)
+        return 1
     
     success = convert_user_to_production(user_json_path)
     
     if success:
         print(f"\n🎉 Conversion complete!")
         print(f"💡 Next step: python scripts/generate_audio.py content/teil1/production-ready/{Path(user_json_path).stem}_production.json")
-    else:
-        sys.exit(1)
+        return 0
+    
+    return 1
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
@@ -6,19 +6,50 @@ Uses Teil-specific configurations from YAML files instead of hardcoded values
 
 import boto3
 import json
+import os
+import subprocess
 import sys
-import yaml
+import threading
 from pathlib import Path
 import shutil
+from concurrent.futures import ThreadPoolExecutor
 from pydub import AudioSegment
 
+from teil_config_generator import get_config_manager
+
+# Concurrent synthesize_speech calls; stays under Polly's default TPS limit
+POLLY_MAX_WORKERS = 8
+
+# Caps in-flight Polly calls across every generator in the process, since a batch
+# runs several generators (each with its own pool) against the shared client
+_polly_slots = threading.BoundedSemaphore(POLLY_MAX_WORKERS)
+
+# Durations of the shared standard clips keyed by (path, mtime_ns, size), so a batch
+# running in one process decodes intro/outro once instead of once per exercise
+_STANDARD_AUDIO_DURATIONS = {}
+
+_polly_client = None
+_polly_client_lock = threading.Lock()
+
+def get_polly_client():
+    """
+    Polly client shared by every generator in this process. Clients are thread-safe
+    (sessions are not), so credential discovery and the connection pool are paid once.
+    """
+    global _polly_client
+    with _polly_client_lock:
+        if _polly_client is None:
+            _polly_client = boto3.session.Session().client('polly', region_name='us-east-1')
+        return _polly_client
+
 class ConfigurableAudioGenerator:
     def __init__(self):
-        self.polly_client = boto3.client('polly', region_name='us-east-1')
+        self.polly_client = get_polly_client()
         self.output_format = 'mp3'
         self.sample_rate = '22050'
         self.audio_sequence = []
         self.total_duration = 0.0
+        self.speech_futures = {}
         
         # Track voice usage to distribute across speakers
         self.voice_assignments = {}
@@ -38,19 +69,14 @@ class ConfigurableAudioGenerator:
     
     def load_teil_config(self, teil: int):
         """Load configuration for specific Teil"""
-        config_path = Path(f'config/teil/teil{teil}.yaml')
+        # Shared manager: parsed once per process and cached on disk between runs
+        self.config = get_config_manager().load_config(teil)
         
-        if not config_path.exists():
+        if self.config is None:
             print(f"Warning: No config found for Teil {teil}, using defaults")
             self.config = self._get_default_config()
         else:
-            try:
-                with open(config_path, 'r', encoding='utf-8') as f:
-                    self.config = yaml.safe_load(f)
-                print(f"Loaded configuration for Teil {teil}")
-            except Exception as e:
-                print(f"Error loading config for Teil {teil}: {e}")
-                self.config = self._get_default_config()
+            print(f"Loaded configuration for Teil {teil}")
         
         # Extract specific config sections
         self.timing_config = self.config.get('timing', {})
@@ -115,14 +141,15 @@ class ConfigurableAudioGenerator:
     def generate_speech(self, text, voice_name='Vicki', engine='generative'):
         """Generate speech with voice hierarchy: generative -> standard"""
         try:
-            response = self.polly_client.synthesize_speech(
-                Text=text,
-                OutputFormat=self.output_format,
-                VoiceId=voice_name,
-                Engine=engine,
-                SampleRate=self.sample_rate
-            )
-            return response['AudioStream'].read()
+            with _polly_slots:
+                response = self.polly_client.synthesize_speech(
+                    Text=text,
+                    OutputFormat=self.output_format,
+                    VoiceId=voice_name,
+                    Engine=engine,
+                    SampleRate=self.sample_rate
+                )
+                return response['AudioStream'].read()
         except Exception as e:
             print(f"Polly error with {voice_name} ({engine}): {e}")
             
@@ -151,6 +178,42 @@ class ConfigurableAudioGenerator:
             
             raise
     
+    def synthesize(self, text, voice_name, engine):
+        """Get speech for a section, waiting on its prefetched Polly call if there is one"""
+        future = self.speech_futures.pop((text, voice_name, engine), None)
+        if future is not None:
+            return future.result()
+        return self.generate_speech(text, voice_name, engine)
+    
+    def get_speech_request(self, section, data):
+        """(text, voice, engine) a section will be synthesized with, or None if it needs no Polly call"""
+        section_type = section['type']
+        
+        if section_type == 'instructions':
+            return (self.get_instructions_text(data), *self.get_preferred_voice('female', 'instructor'))
+        elif section_type == 'transition':
+            return (section.get('transition_text', 'Übergang'), *self.get_preferred_voice('female', 'instructor'))
+        elif section_type == 'combined_task':
+            content_item = data['content'][section['content_ref'] - 1]
+            voice_name, engine, _ = self.get_task_voice(content_item)
+            return (content_item['text'], voice_name, engine)
+        elif section_type == 'answer_reveal':
+            return (self.get_reveal_text(section), *self.get_preferred_voice('female', 'instructor'))
+        
+        # Intro/outro normally come from assets and are synthesized on demand otherwise
+        return None
+    
+    def prefetch_speech(self, sections, data, executor):
+        """Submit every section's Polly call up front so they run concurrently"""
+        requests = [self.get_speech_request(section, data) for section in sections]
+        unique_requests = [request for request in dict.fromkeys(requests) if request is not None]
+        
+        self.speech_futures = {
+            request: executor.submit(self.generate_speech, *request)
+            for request in unique_requests
+        }
+        print(f"Submitted {len(unique_requests)} speech requests ({POLLY_MAX_WORKERS} concurrent)")
+    
     def get_fallback_voice(self, voice_name):
         """Get fallback voice for each primary voice"""
         fallback_map = {
@@ -261,6 +324,23 @@ class ConfigurableAudioGenerator:
         
         return voice_name, engine, gender
     
+    def get_task_voice(self, content_item):
+        """Voice for a task's text: the assigned speaker voice, or the default when there is no speaker info"""
+        if 'speakers' in content_item and content_item['speaker'] in content_item['speakers']:
+            speaker_info = content_item['speakers'][content_item['speaker']]
+            return self.get_smart_voice_for_speaker(speaker_info, content_item)
+        
+        voice_name, engine = self.get_preferred_voice('female', 'service_provider')
+        return voice_name, engine, 'female'
+    
+    def get_instructions_text(self, data):
+        """Spoken instructions text"""
+        return f"{data['instructions']['main']} {data['instructions']['task']} {data['instructions']['repetition']}"
+    
+    def get_reveal_text(self, section):
+        """Spoken answer reveal text"""
+        return f"Die richtige Antwort ist {section['correct_answer']}: {section['answer_text']}"
+    
     def get_preferred_voice(self, gender='female', role='service_provider'):
         """Get preferred voice based on gender"""
         if gender.lower() == 'female':
@@ -271,11 +351,32 @@ class ConfigurableAudioGenerator:
     def save_audio(self, audio_data, output_path):
         """Save audio data to file"""
         Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+        # Never write through a hard link to a shared standard clip
+        Path(output_path).unlink(missing_ok=True)
         with open(output_path, 'wb') as f:
             f.write(audio_data)
     
+    def probe_audio_duration(self, audio_path):
+        """Duration from the file headers via ffprobe, without decoding (None if unavailable)"""
+        try:
+            result = subprocess.run(
+                ['ffprobe', '-v', 'error', '-show_entries', 'format=duration',
+                 '-of', 'default=nw=1:nk=1', str(audio_path)],
+                capture_output=True, text=True
+            )
+            if result.returncode == 0:
+                return float(result.stdout.strip())
+        except (FileNotFoundError, ValueError):
+            pass
+        return None
+    
     def get_audio_duration(self, audio_path):
         """Get duration of audio file in seconds"""
+        # Polly MP3s are constant bitrate, so the header duration is exact
+        duration = self.probe_audio_duration(audio_path)
+        if duration is not None:
+            return duration
+        
         try:
             audio_segment = AudioSegment.from_mp3(audio_path)
             return len(audio_segment) / 1000.0
@@ -293,22 +394,38 @@ class ConfigurableAudioGenerator:
         
         return self.total_duration
     
+    def link_standard_audio(self, source, destination):
+        """Hard-link a shared standard clip into the audio dir (copy where links are unsupported)"""
+        destination.unlink(missing_ok=True)
+        try:
+            os.link(source, destination)
+        except OSError:
+            shutil.copy2(source, destination)
+    
+    def get_standard_audio_duration(self, source):
+        """Duration of a shared standard clip, decoded once per file version"""
+        stat = source.stat()
+        key = (str(source), stat.st_mtime_ns, stat.st_size)
+        if key not in _STANDARD_AUDIO_DURATIONS:
+            _STANDARD_AUDIO_DURATIONS[key] = self.get_audio_duration(source)
+        return _STANDARD_AUDIO_DURATIONS[key]
+    
     def handle_intro_audio(self, section, audio_dir):
         """Handle intro audio"""
         intro_source = Path('assets/standard-audio/intro.mp3')
         intro_path = audio_dir / 'intro.mp3'
         
         if intro_source.exists():
-            shutil.copy2(intro_source, intro_path)
-            print(f"Intro copied from assets")
+            self.link_standard_audio(intro_source, intro_path)
+            intro_duration = self.get_standard_audio_duration(intro_source)
+            print(f"Intro linked from assets")
         else:
             intro_text = "Willkommen zum Goethe A2 Hörverstehen Teil 1"
             voice_name, engine = self.get_preferred_voice('female', 'instructor')
             audio_data = self.generate_speech(intro_text, voice_name, engine)
             self.save_audio(audio_data, intro_path)
             print(f"Intro generated with {voice_name} ({engine})")
-        
-        intro_duration = self.get_audio_duration(intro_path)
+            intro_duration = self.get_audio_duration(intro_path)
         
         step_data = {
             'type': 'intro',
@@ -321,10 +438,10 @@ class ConfigurableAudioGenerator:
     
     def handle_instructions_audio(self, section, data, audio_dir):
         """Handle instructions audio with configurable buffer"""
-        instructions_text = f"{data['instructions']['main']} {data['instructions']['task']} {data['instructions']['repetition']}"
+        instructions_text = self.get_instructions_text(data)
         
         voice_name, engine = self.get_preferred_voice('female', 'instructor')
-        audio_data = self.generate_speech(instructions_text, voice_name, engine)
+        audio_data = self.synthesize(instructions_text, voice_name, engine)
         
         instructions_path = audio_dir / 'instructions.mp3'
         self.save_audio(audio_data, instructions_path)
@@ -351,7 +468,7 @@ class ConfigurableAudioGenerator:
         transition_text = section.get('transition_text', 'Übergang')
         
         voice_name, engine = self.get_preferred_voice('female', 'instructor')
-        audio_data = self.generate_speech(transition_text, voice_name, engine)
+        audio_data = self.synthesize(transition_text, voice_name, engine)
         
         transition_path = audio_dir / f"transition_{section['id']}.mp3"
         self.save_audio(audio_data, transition_path)
@@ -383,17 +500,13 @@ class ConfigurableAudioGenerator:
         content_item = data['content'][content_ref - 1]
         
         # Smart voice selection with multi-speaker support
-        if 'speakers' in content_item and content_item['speaker'] in content_item['speakers']:
-            speaker_info = content_item['speakers'][content_item['speaker']]
-            voice_name, engine, detected_gender = self.get_smart_voice_for_speaker(speaker_info, content_item)
-        else:
-            voice_name, engine = self.get_preferred_voice('female', 'service_provider')
-            detected_gender = 'female'
+        voice_name, engine, detected_gender = self.get_task_voice(content_item)
+        if not ('speakers' in content_item and content_item['speaker'] in content_item['speakers']):
             print(f"   No speaker info, using default: {voice_name} ({engine})")
         
         # Generate audio
         text_content = content_item['text']
-        audio_data = self.generate_speech(text_content, voice_name, engine)
+        audio_data = self.synthesize(text_content, voice_name, engine)
         
         task_path = audio_dir / f"task_{task_number}.mp3"
         self.save_audio(audio_data, task_path)
@@ -433,10 +546,10 @@ class ConfigurableAudioGenerator:
         correct_answer = section['correct_answer']
         answer_text = section['answer_text']
         
-        reveal_text = f"Die richtige Antwort ist {correct_answer}: {answer_text}"
+        reveal_text = self.get_reveal_text(section)
         
         voice_name, engine = self.get_preferred_voice('female', 'instructor')
-        audio_data = self.generate_speech(reveal_text, voice_name, engine)
+        audio_data = self.synthesize(reveal_text, voice_name, engine)
         
         answer_path = audio_dir / f"answer_{task_number}.mp3"
         self.save_audio(audio_data, answer_path)
@@ -467,16 +580,16 @@ class ConfigurableAudioGenerator:
         outro_path = audio_dir / 'outro.mp3'
         
         if outro_source.exists():
-            shutil.copy2(outro_source, outro_path)
-            print(f"Outro copied from assets")
+            self.link_standard_audio(outro_source, outro_path)
+            outro_duration = self.get_standard_audio_duration(outro_source)
+            print(f"Outro linked from assets")
         else:
             outro_text = "Vielen Dank! Vergessen Sie nicht zu liken und zu abonnieren!"
             voice_name, engine = self.get_preferred_voice('female', 'instructor')
             audio_data = self.generate_speech(outro_text, voice_name, engine)
             self.save_audio(audio_data, outro_path)
             print(f"Outro generated with {voice_name} ({engine})")
-        
-        outro_duration = self.get_audio_duration(outro_path)
+            outro_duration = self.get_audio_duration(outro_path)
         
         step_data = {
             'type': 'outro',
@@ -487,17 +600,24 @@ class ConfigurableAudioGenerator:
         self.add_to_sequence(step_data)
         print(f"   Outro: {outro_duration:.1f}s")
     
-    def generate_all_audio(self, production_json_path):
-        """Generate all audio with configurable timing and buffers"""
-        
-        with open(production_json_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+    def generate_all_audio(self, production_json_path, base_name=None):
+        """
+        Generate all audio with configurable timing and buffers.
+        Accepts a production JSON path or its already-parsed dict.
+        """
+        
+        if isinstance(production_json_path, dict):
+            data = production_json_path
+            base_name = base_name or 'production'
+        else:
+            with open(production_json_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            base_name = base_name or Path(production_json_path).stem
         
         # Load Teil-specific configuration
         teil = data['exam_info']['teil']
         self.load_teil_config(teil)
         
-        base_name = Path(production_json_path).stem
         audio_dir = Path('output/audio') / base_name
         audio_dir.mkdir(parents=True, exist_ok=True)
         
@@ -516,32 +636,40 @@ class ConfigurableAudioGenerator:
         print(f"Processing {len(data['sections'])} sections...")
         print(f"Multi-speaker voice distribution enabled")
         
-        # Process each section
-        for i, section in enumerate(data['sections'], 1):
-            section_type = section['type']
-            section_id = section.get('id', 'unknown')
+        with ThreadPoolExecutor(max_workers=POLLY_MAX_WORKERS) as executor:
+            # Polly calls run concurrently; sections are still assembled in order below
+            self.prefetch_speech(data['sections'], data, executor)
             
-            print(f"\n{i:2}/{len(data['sections'])}: {section_id} ({section_type})")
+            # Process each section
+            for i, section in enumerate(data['sections'], 1):
+                section_type = section['type']
+                section_id = section.get('id', 'unknown')
+                
+                print(f"\n{i:2}/{len(data['sections'])}: {section_id} ({section_type})")
+                
+                try:
+                    if section_type == 'intro':
+                        self.handle_intro_audio(section, audio_dir)
+                    elif section_type == 'instructions':
+                        self.handle_instructions_audio(section, data, audio_dir)
+                    elif section_type == 'transition':
+                        self.handle_transition_audio(section, audio_dir)
+                    elif section_type == 'combined_task':
+                        self.handle_combined_task_audio(section, data, audio_dir)
+                    elif section_type == 'answer_reveal':
+                        self.handle_answer_reveal_audio(section, data, audio_dir)
+                    elif section_type == 'outro':
+                        self.handle_outro_audio(section, audio_dir)
+                    else:
+                        print(f"   Unknown section type: {section_type} - skipping")
+                        
+                except Exception as e:
+                    print(f"   Error processing {section_id}: {e}")
+                    for future in self.speech_futures.values():
+                        future.cancel()
+                    raise
             
-            try:
-                if section_type == 'intro':
-                    self.handle_intro_audio(section, audio_dir)
-                elif section_type == 'instructions':
-                    self.handle_instructions_audio(section, data, audio_dir)
-                elif section_type == 'transition':
-                    self.handle_transition_audio(section, audio_dir)
-                elif section_type == 'combined_task':
-                    self.handle_combined_task_audio(section, data, audio_dir)
-                elif section_type == 'answer_reveal':
-                    self.handle_answer_reveal_audio(section, data, audio_dir)
-                elif section_type == 'outro':
-                    self.handle_outro_audio(section, audio_dir)
-                else:
-                    print(f"   Unknown section type: {section_type} - skipping")
-                    
-            except Exception as e:
-                print(f"   Error processing {section_id}: {e}")
-                raise
+            self.speech_futures = {}
         
         # Save sequence info
         sequence_info = {
@@ -611,16 +739,19 @@ class ConfigurableAudioGenerator:
         for voice, count in distribution['total_by_voice'].items():
             print(f"   {voice:20}: {count} speakers")
 
-def main():
-    if len(sys.argv) != 2:
+def main(argv=None):
+    if argv is None:
+        argv = sys.argv[1:]
+    
+    if len(argv) != 1:
         print("Usage: python generate_audio.py <production_json_path>")
-        sys.exit(1)
+        return 1
     
-    production_json_path = Path(sys.argv[1])
+    production_json_path = Path(argv[0])
     
     if not production_json_path.exists():
         print(f"Production JSON not found: {production_json_path}")
-        sys.exit(1)
+        return 1
     
     try:
         generator = ConfigurableAudioGenerator()
@@ -628,12 +759,13 @@ def main():
         
         print(f"\nSuccess! Configurable audio generation complete.")
         print(f"Next: Run video generator with: {audio_dir}")
+        return 0
         
     except Exception as e:
         print(f"Audio generation failed: {e}")
         import traceback
         traceback.print_exc()
-        sys.exit(1)
+        return 1
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
@@ -5,18 +5,34 @@ Measures browser performance and applies real-time timing corrections.
 """
 
 import asyncio
+import contextlib
 import json
 import sys
 import os
 import tempfile
 import shutil
 import time
-import yaml
 import subprocess
 from pathlib import Path
 from playwright.async_api import async_playwright
 import argparse
 
+from teil_config_generator import get_config_manager
+
+BROWSER_ARGS = [
+    '--no-sandbox',
+    '--disable-dev-shm-usage',
+    '--disable-gpu',
+    '--disable-web-security',
+    '--enable-font-antialiasing',
+    '--force-device-scale-factor=1'
+]
+
+async def launch_browser(playwright):
+    """Launch the headless Chromium used for recording; one can serve several recordings"""
+    print("Launching browser for calibrated recording...")
+    return await playwright.chromium.launch(headless=True, args=BROWSER_ARGS)
+
 class TimingCalibratedVideoGenerator:
     def __init__(self):
         self.video_config = {
@@ -24,7 +40,6 @@ class TimingCalibratedVideoGenerator:
             'height': 720,
             'frame_rate': 30
         }
-        self.temp_files = []
         self.start_time = None
         self.sync_tolerance = 0.02  # Very tight tolerance for calibrated system
         
@@ -34,6 +49,12 @@ class TimingCalibratedVideoGenerator:
         self.timing_measurements = []
         self.calibration_samples = 10
         
+        # Kalman drift estimator state
+        self.drift_uncertainty = 0.0      # P: variance of the drift estimate
+        self.drift_process_noise = 1e-4   # Q: how fast true drift may wander
+        self.error_mean = 0.0             # Welford accumulators for the step-error variance
+        self.error_m2 = 0.0
+        
         # Configuration will be loaded per Teil
         self.config = None
         self.timing_config = None
@@ -41,19 +62,13 @@ class TimingCalibratedVideoGenerator:
     
     def load_teil_config(self, teil: int):
         """Load configuration for specific Teil"""
-        config_path = Path(f'config/teil/teil{teil}.yaml')
+        self.config = get_config_manager().load_config(teil)
         
-        if not config_path.exists():
+        if self.config is None:
             print(f"Warning: No config found for Teil {teil}, using defaults")
             self.config = self._get_default_config()
         else:
-            try:
-                with open(config_path, 'r', encoding='utf-8') as f:
-                    self.config = yaml.safe_load(f)
-                print(f"Loaded configuration for Teil {teil}")
-            except Exception as e:
-                print(f"Error loading config for Teil {teil}: {e}")
-                self.config = self._get_default_config()
+            print(f"Loaded configuration for Teil {teil}")
         
         # Extract specific config sections
         self.timing_config = self.config.get('timing', {})
@@ -137,30 +152,12 @@ class TimingCalibratedVideoGenerator:
             print(f"Error processing template: {e}")
             raise
     
-    def create_temp_html(self, processed_html):
-        """Create temporary HTML file and track it for cleanup"""
-        temp_file = tempfile.NamedTemporaryFile(
-            mode='w', 
-            suffix='.html', 
-            delete=False, 
-            encoding='utf-8'
-        )
-        temp_file.write(processed_html)
-        temp_file.close()
-        
-        temp_path = Path(temp_file.name)
-        self.temp_files.append(temp_path)
+    def create_temp_html(self, processed_html, temp_dir):
+        """Write the processed template into the recording's temporary directory"""
+        temp_path = Path(temp_dir) / 'exercise.html'
+        temp_path.write_text(processed_html, encoding='utf-8')
         return temp_path
     
-    def cleanup_temp_files(self):
-        """Clean up all temporary files"""
-        for temp_file in self.temp_files:
-            try:
-                temp_file.unlink()
-            except FileNotFoundError:
-                pass
-        self.temp_files.clear()
-    
     def get_current_time(self):
         """Get current time relative to video start"""
         if self.start_time is None:
@@ -238,13 +235,24 @@ class TimingCalibratedVideoGenerator:
         actual_time = self.get_current_time()
         step_error = actual_time - expected_time
         
-        # Update cumulative drift (weighted average)
-        if len(self.timing_measurements) == 0:
+        # Update cumulative drift with a 1-D Kalman filter. Measurement noise
+        # is the running variance of observed step errors, so stable timing
+        # is tracked closely while jittery timing gets smoothed harder.
+        count = len(self.timing_measurements) + 1
+        delta = step_error - self.error_mean
+        self.error_mean += delta / count
+        self.error_m2 += delta * (step_error - self.error_mean)
+        
+        if count == 1:
             self.cumulative_drift = step_error
+            self.drift_uncertainty = self.drift_process_noise
         else:
-            # Weight recent measurements more heavily
-            weight = 0.3
-            self.cumulative_drift = (1 - weight) * self.cumulative_drift + weight * step_error
+            measurement_noise = max(self.error_m2 / count, 1e-6)
+            
+            self.drift_uncertainty += self.drift_process_noise
+            gain = self.drift_uncertainty / (self.drift_uncertainty + measurement_noise)
+            self.cumulative_drift += gain * (step_error - self.cumulative_drift)
+            self.drift_uncertainty *= (1 - gain)
         
         self.timing_measurements.append({
             'step': step_index,
@@ -307,17 +315,24 @@ class TimingCalibratedVideoGenerator:
             print(f"        Error executing step {step_type}: {e}")
     
     def get_video_duration(self, video_path):
-        """Get video duration using ffprobe"""
+        """Get video duration using ffprobe (container index only, no packet scan)"""
         try:
+            # Ask for the video stream's declared duration first; WebM often
+            # leaves it N/A, so the format-level duration follows as fallback.
             cmd = [
-                'ffprobe', '-v', 'quiet', '-show_entries', 
-                'format=duration', '-of', 'csv=p=0', str(video_path)
+                'ffprobe', '-v', 'error', '-select_streams', 'v:0',
+                '-show_entries', 'stream=duration:format=duration',
+                '-of', 'default=nw=1:nk=1', str(video_path)
             ]
-            result = subprocess.run(cmd, capture_output=True, text=True)
-            if result.returncode == 0:
-                return float(result.stdout.strip())
-            else:
+            result = subprocess.run(cmd, capture_output=True, check=False, text=False)
+            if result.returncode != 0:
                 return None
+            for value in result.stdout.split():
+                try:
+                    return float(value)
+                except ValueError:
+                    continue  # 'N/A'
+            return None
         except Exception as e:
             print(f"Error getting video duration: {e}")
             return None
@@ -392,6 +407,9 @@ class TimingCalibratedVideoGenerator:
         
         # Reset drift tracking
         self.cumulative_drift = 0.0
+        self.drift_uncertainty = 0.0
+        self.error_mean = 0.0
+        self.error_m2 = 0.0
         self.timing_measurements = []
         
         # Inject audio sequence data into page
@@ -459,8 +477,13 @@ class TimingCalibratedVideoGenerator:
         print(f"Error range: {min_error:+.3f}s to {max_error:+.3f}s")
         print(f"Browser lag compensation: {self.browser_lag_baseline:+.3f}s")
     
-    async def record_calibrated_video(self, production_json_path, audio_dir, template_path=None, theme=None, output_path=None):
-        """Record video with full timing calibration system"""
+    async def record_calibrated_video(self, production_json_path, audio_dir, template_path=None, theme=None,
+                                      output_path=None, browser=None):
+        """
+        Record video with full timing calibration system.
+        Pass an already launched `browser` to share it between recordings; each
+        recording gets its own context, and the caller keeps ownership of the browser.
+        """
         
         print(f"Starting calibrated video recording...")
         print(f"Production JSON: {production_json_path}")
@@ -500,11 +523,14 @@ class TimingCalibratedVideoGenerator:
         print(f"Using template: {template_path}")
         print(f"Using theme: {theme}")
         
+        # Removed in the finally below, or by its finalizer if the process exits first
+        temp_dir = tempfile.TemporaryDirectory(prefix='goethe_video_')
         try:
             processed_html = self.process_template(template_path, json_data, theme)
-            temp_html_path = self.create_temp_html(processed_html)
+            temp_html_path = self.create_temp_html(processed_html, temp_dir.name)
         except Exception as e:
             print(f"Template processing failed: {e}")
+            temp_dir.cleanup()
             return None
         
         
@@ -525,28 +551,20 @@ class TimingCalibratedVideoGenerator:
         print(f"Output video: {output_path}")
         
         try:
-            async with async_playwright() as p:
-                print("Launching browser for calibrated recording...")
-                
-                browser = await p.chromium.launch(
-                    headless=True,
-                    args=[
-                        '--no-sandbox',
-                        '--disable-dev-shm-usage',
-                        '--disable-gpu',
-                        '--disable-web-security',
-                        '--enable-font-antialiasing',
-                        '--force-device-scale-factor=1'
-                    ]
-                )
+            async with contextlib.AsyncExitStack() as stack:
+                if browser is None:
+                    p = await stack.enter_async_context(async_playwright())
+                    browser = await launch_browser(p)
+                    stack.push_async_callback(browser.close)
                 
+                # Record into this run's temp dir so concurrent recordings never mix up files
                 context = await browser.new_context(
                     viewport={
                         'width': self.video_config['width'], 
                         'height': self.video_config['height']
                     },
                     device_scale_factor=1,
-                    record_video_dir=str(output_path.parent),
+                    record_video_dir=temp_dir.name,
                     record_video_size={
                         'width': self.video_config['width'],
                         'height': self.video_config['height']
@@ -564,41 +582,39 @@ class TimingCalibratedVideoGenerator:
                 # Execute calibrated sequence
                 await self.execute_calibrated_sequence(page, audio_sequence)
                 
-                # Close and process video
+                # Closing the context finalizes the page's video file
                 await context.close()
-                await browser.close()
                 
-                # Find recorded video
-                recorded_files = list(output_path.parent.glob("*.webm"))
-                if recorded_files:
-                    latest_video = max(recorded_files, key=lambda x: x.stat().st_mtime)
-                    
-                    if latest_video != output_path:
-                        shutil.move(str(latest_video), str(output_path))
-                    
-                    # Validate timing and apply correction if needed
-                    is_valid, actual_duration, speed_factor = self.validate_recording_timing(
-                        output_path, audio_sequence['total_duration'], tolerance=0.5
-                    )
-                    
-                    if not is_valid and speed_factor:
-                        corrected_path = output_path.with_suffix('.corrected.webm')
-                        if self.apply_speed_correction(output_path, corrected_path, speed_factor):
-                            # Replace original with corrected version
-                            shutil.move(str(corrected_path), str(output_path))
-                            print("Speed correction applied to final video")
-                    
-                    file_size = output_path.stat().st_size / (1024*1024)
-                    print(f"Calibrated video recording complete: {output_path}")
-                    print(f"File size: {file_size:.1f} MB")
-                    
-                    # Print timing analysis
-                    self.print_timing_analysis()
-                    
-                    return output_path
-                else:
+                recorded_video = Path(await page.video.path()) if page.video else None
+                if recorded_video is None or not recorded_video.exists():
                     print("No video file found after recording")
                     return None
+                
+                shutil.move(str(recorded_video), str(output_path))
+                
+                # Validate timing and apply correction if needed; ffprobe/ffmpeg run in a
+                # thread so other recordings sharing this event loop keep their timing
+                is_valid, actual_duration, speed_factor = await asyncio.to_thread(
+                    self.validate_recording_timing,
+                    output_path, audio_sequence['total_duration'], tolerance=0.5
+                )
+                
+                if not is_valid and speed_factor:
+                    corrected_path = output_path.with_suffix('.corrected.webm')
+                    if await asyncio.to_thread(self.apply_speed_correction,
+                                               output_path, corrected_path, speed_factor):
+                        # Replace original with corrected version
+                        shutil.move(str(corrected_path), str(output_path))
+                        print("Speed correction applied to final video")
+                
+                file_size = output_path.stat().st_size / (1024*1024)
+                print(f"Calibrated video recording complete: {output_path}")
+                print(f"File size: {file_size:.1f} MB")
+                
+                # Print timing analysis
+                self.print_timing_analysis()
+                
+                return output_path
         
         except Exception as e:
             print(f"Calibrated video recording failed: {e}")
@@ -607,7 +623,7 @@ class TimingCalibratedVideoGenerator:
             return None
         
         finally:
-            self.cleanup_temp_files()
+            temp_dir.cleanup()
 
 async def main():
     """Main function with command line interface"""
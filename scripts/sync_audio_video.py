@@ -4,222 +4,339 @@ Fixed Audio-Video Synchronizer that uses exact audio sequence timing.
 Uses the precise timing from audio_sequence.json instead of recalculating.
 """
 
+import functools
 import json
+import os
 import sys
 import subprocess
 import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from pydub import AudioSegment
 import argparse
 
-class TimingRespectingAudioVideoSynchronizer:
-    def __init__(self):
-        self.temp_files = []
+try:
+    import orjson  # Optional: faster parsing of audio_sequence.json
+except ImportError:
+    orjson = None
+
+# Filters the single-pass master audio graph depends on
+REQUIRED_FFMPEG_FILTERS = ('adelay', 'aformat', 'amix', 'apad', 'asplit')
+
+# Hardware H.264 encoders in order of preference, with rate control for screen content.
+# libx264 (CRF) is the fallback when none is built in or the device is unavailable.
+HARDWARE_ENCODERS = {
+    'h264_videotoolbox': ['-q:v', '50'],
+    'h264_nvenc': ['-b:v', '4M', '-maxrate', '6M'],
+    'h264_qsv': ['-b:v', '4M', '-maxrate', '6M'],
+}
+
+# FFmpeg only reports errors unless SYNC_VERBOSE is set; -nostats drops the
+# per-frame progress lines that would otherwise pile up in the stderr pipe
+SYNC_VERBOSE = bool(os.environ.get('SYNC_VERBOSE'))
+FFMPEG_LOG_ARGS = ['-hide_banner', '-nostats', '-loglevel', 'info' if SYNC_VERBOSE else 'error']
+
+# libx264 threads per encode in --batch mode; jobs run side by side so that
+# cpu_count // BATCH_THREADS_PER_ENCODE encodes fill the machine
+BATCH_THREADS_PER_ENCODE = 4
+
+# Largest allowed gap between a step's start_time and the end of the step before it
+TIMING_TOLERANCE = 0.05
+
+# Every clip is converted to this format once, as it enters the mix graph.
+# Polly already synthesizes 22050 Hz mono MP3, so for generated clips this is a no-op.
+MIX_SAMPLE_RATE = 22050
+MIX_CHANNEL_LAYOUT = 'mono'
+
+# Audio file name for each step type; None falls back to the step's own 'file'
+STEP_AUDIO_FILES = {
+    'intro': lambda step: 'intro.mp3',
+    'instructions': lambda step: 'instructions.mp3',
+    'transition': lambda step: f"transition_{step['id']}.mp3" if 'id' in step else None,
+    'combined_task': lambda step: f"task_{step.get('task_number', 1)}.mp3",
+    'answer_reveal': lambda step: f"answer_{step.get('task_number', 1)}.mp3",
+    'outro': lambda step: 'outro.mp3',
+}
+
+# Output containers each video codec can be copied into as-is, so it only needs remuxing
+COPY_CONTAINERS = {
+    'h264': ('.mp4', '.mkv', '.mov'),
+    'vp8': ('.webm', '.mkv'),
+    'vp9': ('.webm', '.mkv'),
+}
+
+# Parsed JSON keyed by (path, mtime_ns, size); a rewritten file gets a new key
+_JSON_CACHE = {}
+
+def load_json_cached(path):
+    """Load a JSON file, reusing the previous parse while the file is unchanged.
+
+    The returned object is shared between callers and must not be mutated.
+    """
+    path = Path(path)
+    stat = path.stat()
+    key = (str(path), stat.st_mtime_ns, stat.st_size)
     
-    def cleanup_temp_files(self):
-        """Clean up temporary files"""
-        for temp_file in self.temp_files:
-            try:
-                temp_file.unlink()
-            except FileNotFoundError:
-                pass
-        self.temp_files.clear()
+    data = _JSON_CACHE.get(key)
+    if data is None:
+        if orjson is not None:
+            data = orjson.loads(path.read_bytes())
+        else:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        _JSON_CACHE[key] = data
+    return data
+
+@functools.lru_cache(maxsize=64)
+def _run_ffprobe(path, mtime_ns, size):
+    """One ffprobe call per file version; mtime/size are part of the cache key only"""
+    cmd = [
+        'ffprobe', '-v', 'error', '-show_format', '-show_streams',
+        '-of', 'json', path
+    ]
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip())
+    return json.loads(result.stdout)
+
+@functools.lru_cache(maxsize=1)
+def get_ffmpeg_filters():
+    """Names of the filters this FFmpeg build provides, listed once per process (None if FFmpeg is unusable)"""
+    try:
+        result = subprocess.run(['ffmpeg', '-hide_banner', '-filters'], capture_output=True, text=True)
+    except FileNotFoundError:
+        return None
+    if result.returncode != 0:
+        return None
+    return frozenset(line.split()[1] for line in result.stdout.splitlines() if len(line.split()) > 1)
+
+@functools.lru_cache(maxsize=1)
+def get_ffmpeg_encoders():
+    """Names of the encoders this FFmpeg build provides, listed once per process"""
+    try:
+        result = subprocess.run(['ffmpeg', '-hide_banner', '-encoders'], capture_output=True, text=True)
+    except FileNotFoundError:
+        return frozenset()
+    return frozenset(line.split()[1] for line in result.stdout.splitlines() if len(line.split()) > 1)
+
+def pick_video_encoder():
+    """First available hardware H.264 encoder, else libx264"""
+    encoders = get_ffmpeg_encoders()
+    for name in HARDWARE_ENCODERS:
+        if name in encoders:
+            return name
+    return 'libx264'
+
+def probe_media(path):
+    """Return ffprobe's format and stream info for a file, cached while it is unchanged"""
+    stat = Path(path).stat()
+    return _run_ffprobe(str(path), stat.st_mtime_ns, stat.st_size)
+
+class TimingRespectingAudioVideoSynchronizer:
+    def __init__(self, fast_mux=False, preset='veryfast', crf=23, tune='stillimage', audio_bitrate='128k',
+                 hardware_encoding=True, threads=0):
+        self.fast_mux = fast_mux  # Always stream-copy the video
+        self.hardware_encoding = hardware_encoding
+        self.threads = threads    # libx264 threads, 0 = auto
+        self.preset = preset      # libx264 preset when re-encoding ('ultrafast' for drafts)
+        self.crf = crf
+        self.tune = tune          # Exercise slides are mostly static between transitions
+        self.audio_bitrate = audio_bitrate
     
     def check_ffmpeg(self):
-        """Check if FFmpeg is available"""
-        try:
-            result = subprocess.run(['ffmpeg', '-version'], 
-                                  capture_output=True, text=True)
-            if result.returncode == 0:
-                print("✅ FFmpeg is available")
-                return True
-            else:
-                print("❌ FFmpeg check failed")
-                return False
-        except FileNotFoundError:
-            print("❌ FFmpeg not found")
+        """Check if FFmpeg is available and has the audio filters we need"""
+        available = get_ffmpeg_filters()
+        if available is None:
+            print("❌ FFmpeg not found or not working")
+            return False
+        
+        missing = [name for name in REQUIRED_FFMPEG_FILTERS if name not in available]
+        if missing:
+            print(f"❌ FFmpeg is missing required filters: {', '.join(missing)}")
             return False
+        
+        print("✅ FFmpeg is available")
+        return True
     
     def get_actual_audio_duration(self, audio_file):
-        """Get actual duration of audio file using pydub"""
-        try:
-            audio = AudioSegment.from_mp3(audio_file)
-            return len(audio) / 1000.0  # Convert to seconds
-        except Exception as e:
-            print(f"⚠️ Could not get duration for {audio_file}: {e}")
-            return 0.0
+        """Get actual duration of audio file using ffprobe"""
+        duration = self.get_video_duration(audio_file)
+        return duration if duration is not None else 0.0
+    
+    def _resolve_step_file(self, step, audio_dir):
+        """Map a sequence step to the audio file it plays (None if it has none)"""
+        resolver = STEP_AUDIO_FILES.get(step['type'])
+        file_name = resolver(step) if resolver else None
+        if file_name:
+            return audio_dir / file_name
+        
+        # Use file path from sequence if available
+        step_file = step.get('file', '')
+        if step_file:
+            audio_file = Path(step_file)
+            if not audio_file.is_absolute():
+                audio_file = audio_dir / audio_file.name
+            return audio_file
+        return None
+    
+    def find_timing_error(self, audio_sequence, tolerance=TIMING_TOLERANCE):
+        """
+        Check that every step starts where the previous one ends.
+        Returns (step_index, error_seconds) for the worst step beyond tolerance, or None.
+        """
+        worst = None
+        expected_start = 0.0
+        for i, step in enumerate(audio_sequence['sequence'], 1):
+            error = step['start_time'] - expected_start
+            if abs(error) > tolerance and (worst is None or abs(error) > abs(worst[1])):
+                worst = (i, error)
+            expected_start = step['start_time'] + step.get('total_duration', step.get('duration', 0))
+        return worst
     
-    def create_master_audio_using_sequence_timing(self, audio_dir, audio_sequence):
+    def plan_audio_placements(self, audio_dir, audio_sequence):
         """
-        Create master audio track using EXACT timing from audio_sequence.json.
-        This fixes the timing mismatch by respecting the audio generator's timing.
+        Turn audio_sequence.json into (audio_file, start_seconds) placements.
+        Positions come straight from each step's start_time, so nothing can drift.
         """
-        print("🎵 Creating master audio using exact sequence timing...")
+        print("🎵 Planning master audio using exact sequence timing...")
         print(f"📊 Expected duration: {audio_sequence['total_duration']:.2f}s")
         
-        # Start with silence
-        master_audio = AudioSegment.silent(duration=0)
-        current_position = 0.0
+        placements = []
         
         for i, step in enumerate(audio_sequence['sequence'], 1):
             step_type = step['type']
             step_start = step['start_time']  # EXACT timing from audio generator
-            step_file = step.get('file', '')
+            audio_file = self._resolve_step_file(step, audio_dir)
             
             print(f"   Step {i}: {step_type} at {step_start:.2f}s")
             
-            # Add silence to reach the EXACT start time from sequence
-            if step_start > current_position:
-                silence_duration = (step_start - current_position) * 1000  # Convert to ms
-                master_audio += AudioSegment.silent(duration=int(silence_duration))
-                current_position = step_start
-                print(f"      Added {silence_duration/1000:.2f}s silence to reach {step_start:.2f}s")
-            
-            # Determine audio file path
-            audio_file = None
+            if audio_file is None or not audio_file.exists():
+                print(f"   ⚠️ Audio file not found: {audio_file}")
+                continue
             
-            if step_type == 'intro':
-                audio_file = audio_dir / 'intro.mp3'
-            elif step_type == 'instructions':
-                audio_file = audio_dir / 'instructions.mp3'
-            elif step_type == 'transition':
-                # Extract transition ID from step
-                transition_id = step.get('id', 'unknown')
-                audio_file = audio_dir / f'transition_{transition_id}.mp3'
-            elif step_type == 'combined_task':
-                task_number = step.get('task_number', 1)
-                audio_file = audio_dir / f'task_{task_number}.mp3'
-                
-                # Handle task start buffer as SILENCE (not audio)
+            if step_type == 'combined_task':
+                # Task start buffer is silence before the first play
                 task_start_buffer = step.get('task_start_buffer', 0)
-                if task_start_buffer > 0:
-                    print(f"      Adding {task_start_buffer:.2f}s task start buffer as silence")
-                    buffer_ms = task_start_buffer * 1000
-                    master_audio += AudioSegment.silent(duration=int(buffer_ms))
-                    current_position += task_start_buffer
+                play_count = step.get('play_count', 2)
+                pause_between = step.get('pause_between', 3.0)
+                thinking_time = step.get('thinking_time', 5.0)
+                text_duration = step.get('text_duration')
+                if text_duration is None:
+                    text_duration = self.get_actual_audio_duration(audio_file)
                 
-            elif step_type == 'answer_reveal':
-                task_number = step.get('task_number', 1)
-                audio_file = audio_dir / f'answer_{task_number}.mp3'
-            elif step_type == 'outro':
-                audio_file = audio_dir / 'outro.mp3'
-            elif step_file:
-                # Use file path from sequence if available
-                audio_file = Path(step_file)
-                if not audio_file.is_absolute():
-                    audio_file = audio_dir / audio_file.name
-            
-            if audio_file and audio_file.exists():
-                try:
-                    audio_segment = AudioSegment.from_mp3(audio_file)
-                    actual_duration = len(audio_segment) / 1000.0
-                    
-                    # Handle combined tasks with repetition
-                    if step_type == 'combined_task':
-                        play_count = step.get('play_count', 2)
-                        pause_between = step.get('pause_between', 3.0) * 1000  # Convert to ms
-                        thinking_time = step.get('thinking_time', 5.0) * 1000  # Convert to ms
-                        
-                        if play_count == 2:
-                            # Play twice with pause
-                            master_audio += audio_segment
-                            master_audio += AudioSegment.silent(duration=int(pause_between))
-                            master_audio += audio_segment
-                            
-                            # Add thinking time after second play
-                            master_audio += AudioSegment.silent(duration=int(thinking_time))
-                            
-                            audio_duration = actual_duration * 2 + (pause_between / 1000.0) + (thinking_time / 1000.0)
-                            print(f"      Added task: {actual_duration:.2f}s × 2 + {pause_between/1000:.2f}s pause + {thinking_time/1000:.2f}s thinking")
-                        else:
-                            master_audio += audio_segment
-                            audio_duration = actual_duration
-                            print(f"      Added task: {actual_duration:.2f}s × 1")
-                    else:
-                        # Single play for intro, instructions, answers, outro
-                        master_audio += audio_segment
-                        audio_duration = actual_duration
-                        print(f"      Added {step_type}: {actual_duration:.2f}s")
-                    
-                    current_position += audio_duration
-                    
-                    # Add buffer after instructions
-                    if step_type == 'instructions':
-                        buffer_after = step.get('buffer_after', 0)
-                        if buffer_after > 0:
-                            buffer_ms = buffer_after * 1000
-                            master_audio += AudioSegment.silent(duration=int(buffer_ms))
-                            current_position += buffer_after
-                            print(f"      Added {buffer_after:.2f}s buffer after instructions")
-                    
-                    # Add pause after answer reveals
-                    if step_type == 'answer_reveal':
-                        pause_after = step.get('pause_after', 0)
-                        if pause_after > 0:
-                            pause_ms = pause_after * 1000
-                            master_audio += AudioSegment.silent(duration=int(pause_ms))
-                            current_position += pause_after
-                            print(f"      Added {pause_after:.2f}s pause after answer")
+                first_play = step_start + task_start_buffer
+                for play in range(play_count):
+                    placements.append((audio_file, first_play + play * (text_duration + pause_between)))
                 
-                except Exception as e:
-                    print(f"   ❌ Error loading {audio_file}: {e}")
-                    continue
+                print(f"      Placed task: {task_start_buffer:.2f}s buffer + {text_duration:.2f}s × {play_count} "
+                      f"+ {pause_between:.2f}s pause + {thinking_time:.2f}s thinking")
             else:
-                print(f"   ⚠️ Audio file not found: {audio_file}")
-                continue
+                # Single play for intro, instructions, transitions, answers, outro;
+                # buffers and pauses after them are silence in the mix
+                placements.append((audio_file, step_start))
+                print(f"      Placed {step_type}")
         
-        # Save master audio track
-        master_audio_path = tempfile.NamedTemporaryFile(
-            suffix='.wav', delete=False
-        )
-        master_audio_path.close()
-        
-        master_audio_file = Path(master_audio_path.name)
-        self.temp_files.append(master_audio_file)
-        
-        print(f"💾 Exporting master audio ({len(master_audio)/1000:.2f}s)...")
-        master_audio.export(str(master_audio_file), format="wav")
+        return placements
+    
+    def build_audio_filter_graph(self, placements, first_input_index=1):
+        """
+        Build the filter_complex that places every clip with adelay and sums them with amix.
         
-        expected_duration = audio_sequence['total_duration']
-        actual_duration = len(master_audio) / 1000.0
-        timing_error = actual_duration - expected_duration
+        Each distinct file becomes one FFmpeg input (numbered from first_input_index) and is
+        converted to the mix format once; files played more than once are then fanned out
+        with asplit instead of being reopened or resampled per play.
+        Returns (input_files, filter_complex) with the mixed track labelled [aout].
+        """
+        input_files = list(dict.fromkeys(audio_file for audio_file, _ in placements))
+        input_index = {audio_file: first_input_index + k for k, audio_file in enumerate(input_files)}
+        uses = {audio_file: sum(1 for f, _ in placements if f == audio_file) for audio_file in input_files}
+        
+        chains = []
+        sources = {}
+        for audio_file in input_files:
+            k = input_index[audio_file]
+            normalize = f"[{k}:a]aformat=sample_rates={MIX_SAMPLE_RATE}:channel_layouts={MIX_CHANNEL_LAYOUT}"
+            if uses[audio_file] > 1:
+                labels = [f"[s{k}_{n}]" for n in range(uses[audio_file])]
+                chains.append(f"{normalize},asplit={uses[audio_file]}{''.join(labels)}")
+                sources[audio_file] = labels
+            else:
+                chains.append(f"{normalize}[f{k}]")
+                sources[audio_file] = [f"[f{k}]"]
         
-        print(f"✅ Master audio created: {master_audio_file}")
-        print(f"📊 Expected duration: {expected_duration:.2f}s")
-        print(f"📊 Actual duration: {actual_duration:.2f}s")
-        print(f"🔍 Timing error: {timing_error:+.2f}s")
+        mix_inputs = []
+        for j, (audio_file, start_seconds) in enumerate(placements):
+            delay_ms = max(0, int(round(start_seconds * 1000)))
+            chains.append(f"{sources[audio_file].pop(0)}adelay=delays={delay_ms}:all=1[p{j}]")
+            mix_inputs.append(f"[p{j}]")
         
-        if abs(timing_error) > 0.5:
-            print(f"⚠️ Large timing error detected! Check audio sequence timing.")
-        else:
-            print(f"✅ Timing accuracy within tolerance")
+        # normalize=0 keeps every clip at full level; apad lets -t set the exact length
+        chains.append(f"{''.join(mix_inputs)}amix=inputs={len(mix_inputs)}:normalize=0:dropout_transition=0,apad[aout]")
         
-        return master_audio_file, actual_duration
+        return input_files, ';'.join(chains)
     
     def get_video_duration(self, video_path):
-        """Get video duration using ffprobe"""
+        """Get media duration using ffprobe"""
         try:
-            cmd = [
-                'ffprobe', '-v', 'quiet', '-show_entries', 
-                'format=duration', '-of', 'csv=p=0', str(video_path)
-            ]
-            result = subprocess.run(cmd, capture_output=True, text=True)
-            if result.returncode == 0:
-                return float(result.stdout.strip())
-            else:
-                print(f"⚠️ Could not get video duration: {result.stderr}")
-                return None
+            return float(probe_media(video_path)['format']['duration'])
+        except Exception as e:
+            print(f"⚠️ Could not get duration for {video_path}: {e}")
+            return None
+    
+    def get_video_codec(self, video_path):
+        """Get the codec name of the first video stream using ffprobe"""
+        try:
+            streams = probe_media(video_path).get('streams', [])
         except Exception as e:
-            print(f"⚠️ Error getting video duration: {e}")
+            print(f"⚠️ Error getting video codec: {e}")
             return None
+        
+        for stream in streams:
+            if stream.get('codec_type') == 'video':
+                return stream.get('codec_name')
+        return None
+    
+    def get_video_codec_options(self, video_path, output_path):
+        """
+        Video codec arguments to try in order: a stream copy when the codec fits the
+        output container, else a hardware H.264 encoder (if any) followed by libx264.
+        """
+        if self.fast_mux:
+            print("⚡ Fast mux: copying video stream")
+            return [['-c:v', 'copy']]
+        
+        codec = self.get_video_codec(video_path)
+        if Path(output_path).suffix.lower() in COPY_CONTAINERS.get(codec, ()):
+            print(f"⚡ {codec} fits {Path(output_path).suffix}: copying video stream")
+            return [['-c:v', 'copy']]
+        
+        # Playwright records VP8/VP9 WebM, which MP4 can't carry; veryfast at CRF 23
+        # is indistinguishable from medium for screen content
+        libx264_args = [
+            '-c:v', 'libx264',
+            '-preset', self.preset,
+            '-tune', self.tune,
+            '-crf', str(self.crf),
+            '-threads', str(self.threads),
+            '-x264-params', 'sliced-threads=1'
+        ]
+        
+        encoder = pick_video_encoder() if self.hardware_encoding else 'libx264'
+        if encoder == 'libx264':
+            print(f"🎞️ Re-encoding {codec or 'unknown'} video to H.264 ({self.preset}, CRF {self.crf})")
+            return [libx264_args]
+        
+        print(f"🎞️ Re-encoding {codec or 'unknown'} video to H.264 with {encoder}")
+        return [['-c:v', encoder, *HARDWARE_ENCODERS[encoder]], libx264_args]
     
-    def combine_audio_video_with_precise_timing(self, video_path, audio_path, output_path, target_duration):
+    def combine_audio_video_with_precise_timing(self, video_path, placements, output_path, target_duration):
         """
-        Combine video and audio with precise timing control.
+        Mix the placed clips and mux them with the video in a single FFmpeg pass.
         """
+        input_files, filter_complex = self.build_audio_filter_graph(placements)
+        
         print(f"🎬 Combining audio and video with precise timing...")
         print(f"📹 Video: {video_path}")
-        print(f"🎵 Audio: {audio_path}")
+        print(f"🎵 Audio: {len(placements)} clips from {len(input_files)} files")
         print(f"🎯 Target duration: {target_duration:.2f}s")
         print(f"📍 Output: {output_path}")
         
@@ -234,50 +351,69 @@ class TimingRespectingAudioVideoSynchronizer:
                 print(f"⚠️ Large duration mismatch: video={video_duration:.2f}s, audio={target_duration:.2f}s")
                 print(f"⚠️ This may indicate timing synchronization issues")
         
-        # FFmpeg command with precise timing control
-        cmd = [
-            'ffmpeg',
-            '-i', str(video_path),
-            '-i', str(audio_path),
-            '-c:v', 'libx264',
-            '-c:a', 'aac',
-            '-preset', 'medium',
-            '-crf', '23',
-            '-t', str(target_duration),  # Force exact duration
-            '-avoid_negative_ts', 'make_zero',  # Handle timing issues
-            '-map', '0:v:0',  # Use video from first input
-            '-map', '1:a:0',  # Use audio from second input
-            '-y',
-            str(output_path)
-        ]
-        
         print("🔧 Running FFmpeg with precise timing control...")
         
+        output_path = Path(output_path)
         try:
-            result = subprocess.run(cmd, capture_output=True, text=True)
-            
-            if result.returncode == 0:
-                print("✅ Audio-video combination successful!")
+            # Encode into a scratch dir beside the output, then swap it in atomically:
+            # an aborted run never leaves a truncated video at output_path
+            with tempfile.TemporaryDirectory(prefix='goethe_sync_', dir=output_path.parent) as temp_dir:
+                partial_path = Path(temp_dir) / f"partial{output_path.suffix}"
                 
-                # Verify output duration
-                output_duration = self.get_video_duration(output_path)
-                if output_duration:
-                    duration_diff = abs(output_duration - target_duration)
-                    print(f"📊 Output duration: {output_duration:.2f}s")
-                    print(f"🔍 Duration accuracy: ±{duration_diff:.2f}s")
+                codec_options = self.get_video_codec_options(video_path, output_path)
+                for attempt, video_args in enumerate(codec_options, 1):
+                    # FFmpeg command with precise timing control
+                    cmd = ['ffmpeg', *FFMPEG_LOG_ARGS, '-i', str(video_path)]
+                    for audio_file in input_files:
+                        cmd += ['-i', str(audio_file)]
+                    cmd += [
+                        '-filter_complex', filter_complex,
+                        *video_args,
+                        '-c:a', 'aac',
+                        '-b:a', self.audio_bitrate,
+                        '-t', str(target_duration),  # Force exact duration
+                        '-avoid_negative_ts', 'make_zero',  # Handle timing issues
+                        '-map', '0:v:0',  # Use video from first input
+                        '-map', '[aout]',  # Use the mixed audio graph
+                    ]
+                    if output_path.suffix.lower() in ('.mp4', '.mov'):
+                        cmd += ['-movflags', '+faststart']  # moov atom first, so web playback starts immediately
+                    cmd += ['-y', str(partial_path)]
+                    if SYNC_VERBOSE:
+                        print(f"   {' '.join(cmd)}")
                     
-                    if duration_diff < 0.1:
-                        print("✅ Excellent duration match")
-                    elif duration_diff < 0.5:
-                        print("✅ Good duration match")
-                    else:
-                        print("⚠️ Duration mismatch detected")
+                    # Only stderr is kept, and only decoded when the run fails
+                    result = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+                    if result.returncode == 0:
+                        break
+                    
+                    if attempt < len(codec_options):
+                        # Encoder compiled in but no usable device, e.g. NVENC without a GPU
+                        print(f"⚠️ {video_args[1]} failed, retrying with {codec_options[attempt][1]}")
+                else:
+                    print("❌ FFmpeg failed:")
+                    print(f"   STDERR: {result.stderr.decode('utf-8', errors='replace')}")
+                    return False
                 
-                return True
-            else:
-                print("❌ FFmpeg failed:")
-                print(f"   STDERR: {result.stderr}")
-                return False
+                os.replace(partial_path, output_path)
+            
+            print("✅ Audio-video combination successful!")
+            
+            # Verify output duration
+            output_duration = self.get_video_duration(output_path)
+            if output_duration:
+                duration_diff = abs(output_duration - target_duration)
+                print(f"📊 Output duration: {output_duration:.2f}s")
+                print(f"🔍 Duration accuracy: ±{duration_diff:.2f}s")
+                
+                if duration_diff < 0.1:
+                    print("✅ Excellent duration match")
+                elif duration_diff < 0.5:
+                    print("✅ Good duration match")
+                else:
+                    print("⚠️ Duration mismatch detected")
+            
+            return True
                 
         except Exception as e:
             print(f"❌ Error running FFmpeg: {e}")
@@ -296,19 +432,10 @@ class TimingRespectingAudioVideoSynchronizer:
         base_name = production_json_path.stem
         audio_dir = Path('output/audio') / base_name
         
-        if not audio_dir.exists():
-            print(f"❌ Audio directory not found: {audio_dir}")
-            return None
-        
         # Load audio sequence - THIS IS THE TIMING SOURCE OF TRUTH
         audio_sequence_path = audio_dir / 'audio_sequence.json'
-        if not audio_sequence_path.exists():
-            print(f"❌ Audio sequence not found: {audio_sequence_path}")
-            return None
-        
         try:
-            with open(audio_sequence_path, 'r', encoding='utf-8') as f:
-                audio_sequence = json.load(f)
+            audio_sequence = load_json_cached(audio_sequence_path)
             print(f"✅ Audio sequence loaded ({len(audio_sequence['sequence'])} steps)")
             print(f"📊 Audio sequence duration: {audio_sequence['total_duration']:.2f}s")
             
@@ -317,10 +444,22 @@ class TimingRespectingAudioVideoSynchronizer:
                             for step in audio_sequence['sequence'])
             print(f"📋 Buffer timing detected: {has_buffers}")
             
+        except FileNotFoundError:
+            print(f"❌ Audio sequence not found: {audio_sequence_path}")
+            return None
         except Exception as e:
             print(f"❌ Error loading audio sequence: {e}")
             return None
         
+        # Fail fast on an inconsistent sequence, before probing or encoding anything
+        timing_error = self.find_timing_error(audio_sequence)
+        if timing_error:
+            step_index, error = timing_error
+            step_type = audio_sequence['sequence'][step_index - 1]['type']
+            print(f"❌ Inconsistent sequence timing: step {step_index} ({step_type}) starts {error:+.2f}s "
+                  f"from the end of the previous step")
+            return None
+        
         # Determine video path - use provided path first, then fallback to auto-detection
         if video_path is not None:
             video_path = Path(video_path)
@@ -367,14 +506,16 @@ class TimingRespectingAudioVideoSynchronizer:
             return None
         
         try:
-            # Create master audio track using EXACT sequence timing
-            master_audio_path, actual_duration = self.create_master_audio_using_sequence_timing(
-                audio_dir, audio_sequence
-            )
+            # Place every clip using EXACT sequence timing
+            placements = self.plan_audio_placements(audio_dir, audio_sequence)
+            if not placements:
+                print("❌ No audio clips found for this sequence")
+                return None
             
-            # Combine audio and video with precise timing control
+            # Mix and mux in one FFmpeg pass with precise timing control
+            actual_duration = audio_sequence['total_duration']
             success = self.combine_audio_video_with_precise_timing(
-                video_path, master_audio_path, output_path, actual_duration
+                video_path, placements, output_path, actual_duration
             )
             
             if success and output_path.exists():
@@ -395,23 +536,64 @@ class TimingRespectingAudioVideoSynchronizer:
             import traceback
             traceback.print_exc()
             return None
+
+    def sync_batch(self, production_json_paths, max_workers=None):
+        """
+        Synchronize several productions in this process, sharing the probe and
+        filter caches. Returns the output path (or None) for each production.
+        """
+        if max_workers is None:
+            max_workers = max(1, (os.cpu_count() or 1) // BATCH_THREADS_PER_ENCODE)
         
-        finally:
-            # Clean up temporary files
-            self.cleanup_temp_files()
+        print(f"📦 Batch: {len(production_json_paths)} productions, {max_workers} concurrent encodes")
+        
+        # Each worker blocks on its own FFmpeg process, so threads are enough
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(self.sync_audio_video, production_json_paths))
 
 def main():
     """Main function with command line interface"""
     parser = argparse.ArgumentParser(description='Timing-accurate audio-video synchronization')
-    parser.add_argument('production_json', help='Path to production JSON file')
+    parser.add_argument('production_json', nargs='?', help='Path to production JSON file')
+    parser.add_argument('--batch', help='File listing one production JSON path per line')
+    parser.add_argument('--jobs', type=int, help='Concurrent encodes in --batch mode (default: CPU count / 4)')
     parser.add_argument('--video-file', help='Path to input video file')
     parser.add_argument('--output', help='Output path for synced video')
     parser.add_argument('--video', help='Path to video file (backwards compatibility)')
     parser.add_argument('--analyze-timing', action='store_true', help='Analyze timing without syncing')
     parser.add_argument('--check-only', action='store_true', help='Only check if files exist')
+    parser.add_argument('--preset', default='veryfast',
+                       help='libx264 preset when the video must be re-encoded (default: veryfast)')
+    parser.add_argument('--crf', type=int, default=23, help='libx264 CRF when re-encoding (default: 23)')
+    parser.add_argument('--tune', default='stillimage',
+                       help='libx264 tune when re-encoding (default: stillimage; use film for motion-heavy video)')
+    parser.add_argument('--no-hw-encode', action='store_true',
+                       help='Always use libx264 instead of a hardware H.264 encoder')
+    parser.add_argument('--fast-mux', action='store_true',
+                       help='Copy the video stream instead of re-encoding (input must fit the output container)')
     
     args = parser.parse_args()
     
+    if args.batch:
+        with open(args.batch, 'r', encoding='utf-8') as f:
+            production_jsons = [line.strip() for line in f
+                                if line.strip() and not line.lstrip().startswith('#')]
+        
+        synchronizer = TimingRespectingAudioVideoSynchronizer(
+            fast_mux=args.fast_mux, preset=args.preset, crf=args.crf, tune=args.tune,
+            hardware_encoding=not args.no_hw_encode, threads=BATCH_THREADS_PER_ENCODE
+        )
+        results = synchronizer.sync_batch(production_jsons, max_workers=args.jobs)
+        
+        failed = [path for path, result in zip(production_jsons, results) if not result]
+        print(f"\n📊 Batch complete: {len(results) - len(failed)}/{len(results)} synchronized")
+        for path in failed:
+            print(f"   ❌ {path}")
+        sys.exit(1 if failed else 0)
+    
+    if not args.production_json:
+        parser.error('production_json is required unless --batch is given')
+    
     if args.analyze_timing:
         # Analyze timing accuracy
         production_json_path = Path(args.production_json)
@@ -419,10 +601,12 @@ def main():
         audio_dir = Path('output/audio') / base_name
         
         sequence_file = audio_dir / 'audio_sequence.json'
-        if sequence_file.exists():
-            with open(sequence_file, 'r') as f:
-                sequence = json.load(f)
-            
+        try:
+            sequence = load_json_cached(sequence_file)
+        except FileNotFoundError:
+            sequence = None
+        
+        if sequence is not None:
             print("🔍 Timing Analysis for Synchronization:")
             print(f"📊 Total duration: {sequence['total_duration']:.2f}s")
             print(f"🎵 Steps: {len(sequence['sequence'])}")
@@ -442,6 +626,11 @@ def main():
                 
                 print(f"  {i:2}. {start_time:6.2f}s: {step_type:15} ({duration:.2f}s){buffer_info}")
             
+            timing_error = TimingRespectingAudioVideoSynchronizer().find_timing_error(sequence)
+            if timing_error:
+                print(f"\n❌ Step {timing_error[0]} is off by {timing_error[1]:+.2f}s; sync would refuse this sequence")
+                return False
+            
             print(f"\n✅ This timing will be used exactly for audio-video sync")
             return True
         else:
@@ -505,7 +694,10 @@ def main():
     video_path = args.video_file if args.video_file else args.video
     
     # Run timing-accurate synchronization
-    synchronizer = TimingRespectingAudioVideoSynchronizer()
+    synchronizer = TimingRespectingAudioVideoSynchronizer(
+        fast_mux=args.fast_mux, preset=args.preset, crf=args.crf, tune=args.tune,
+        hardware_encoding=not args.no_hw_encode
+    )
     
     try:
         final_video = synchronizer.sync_audio_video(
@@ -4,9 +4,15 @@ Complete synchronized pipeline: User JSON → Final MP4 with perfect timing
 Enhanced with synchronization validation and timing analysis.
 """
 
+import os
 import sys
-import subprocess
 import asyncio
+import collections
+import contextlib
+import contextvars
+import hashlib
+import importlib
+import io
 import time
 import json
 from pathlib import Path
@@ -14,16 +20,110 @@ import argparse
 from datetime import datetime
 import shutil
 
+from sync_audio_video import HARDWARE_ENCODERS, pick_video_encoder
+
+# Steps that are plain Python and are called in-process through their main(argv).
+# Playwright recording and FFmpeg sync keep their own interpreter.
+IN_PROCESS_SCRIPTS = ('convert_content.py', 'generate_audio.py')
+
+# Prerequisite checks that passed before, keyed by binary path and mtime
+PREREQ_CACHE = Path.home() / '.cache' / 'goethe-pipeline' / 'prereqs.json'
+
+STANDARD_AUDIO_PATHS = [
+    'assets/standard-audio/intro.mp3',
+    'assets/standard-audio/outro.mp3'
+]
+
+TEMPLATE_PATHS = [
+    'templates/base/teil1_flexible.html',
+    'templates/base/teil1_base.html',
+    'templates/themed/teil1_energetic.html',
+    'templates/themed/teil1_professional.html',
+    'templates/styles/teil1_current.html'
+]
+
+# Timing values written into audio_sequence.json (thinking time, pauses, buffers);
+# the defaults module applies when the YAML is missing
+TEIL_CONFIG_PATHS = [
+    'config/teil/teil1.yaml',
+    'scripts/_teil_defaults.py'
+]
+
+# Output buffer of the in-process step running in the current thread or task, if any
+_captured_output = contextvars.ContextVar('captured_output', default=None)
+
+class _RoutedStream:
+    """Stand-in for sys.stdout/stderr that sends writes from capturing steps to their buffer"""
+    def __init__(self, stream):
+        self._stream = stream
+    
+    def write(self, text):
+        buffer = _captured_output.get()
+        return (self._stream if buffer is None else buffer).write(text)
+    
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+def install_output_routing():
+    """
+    Route sys.stdout/stderr through _RoutedStream. redirect_stdout would swap the
+    stream for every thread and task at once; this captures per step instead.
+    """
+    if not isinstance(sys.stdout, _RoutedStream):
+        sys.stdout = _RoutedStream(sys.stdout)
+        sys.stderr = _RoutedStream(sys.stderr)
+
+def list_existing(paths):
+    """Subset of `paths` that exist as files, reading each parent directory once"""
+    by_parent = {}
+    for path in paths:
+        by_parent.setdefault(os.path.dirname(path) or '.', []).append(path)
+    
+    existing = set()
+    for parent, candidates in by_parent.items():
+        try:
+            with os.scandir(parent) as entries:
+                names = {entry.name for entry in entries if entry.is_file()}
+        except FileNotFoundError:
+            continue
+        existing.update(path for path in candidates if os.path.basename(path) in names)
+    return existing
+
+def find_user_files(input_dir):
+    """List the user JSON files in a directory with a single directory read"""
+    with os.scandir(input_dir) as entries:
+        return sorted(Path(entry.path) for entry in entries
+                      if entry.name.endswith('.json') and entry.is_file())
+
 class SynchronizedPipeline:
-    def __init__(self, verbose=False):
+    def __init__(self, verbose=False, tag=None, entry_points=None, force=False, browser=None):
         self.verbose = verbose
+        self.browser = browser  # Shared Chromium for in-process recording (batch mode)
+        self.tag = tag
+        self.force = force  # Re-run stages even when their inputs are unchanged
         self.start_time = time.time()
         self.step_times = {}
+        self._json_cache = {}  # path -> (mtime_ns, size, parsed JSON)
+        self.audio_file_count = 0
+        self.entry_points = entry_points if entry_points is not None else self._import_entry_points()
+    
+    def _import_entry_points(self):
+        """Import in-process step modules once; unimportable ones fall back to subprocess"""
+        entry_points = {}
+        for script_name in IN_PROCESS_SCRIPTS:
+            try:
+                module = importlib.import_module(Path(script_name).stem)
+            except ImportError:
+                continue
+            entry_points[script_name] = module.main
+        return entry_points
         
     def log(self, message, step=None):
         """Log message with timestamp"""
         current_time = time.time()
         elapsed = current_time - self.start_time
+        if self.tag:
+            message = f"[{self.tag}] {message}"
         
         if step:
             if step in self.step_times:
@@ -35,8 +135,153 @@ class SynchronizedPipeline:
         else:
             print(f"[{elapsed:06.1f}s] {message}")
     
-    def run_script(self, script_name, args, step_name):
+    def log_block(self, lines):
+        """Log several lines under one timestamp with a single write"""
+        elapsed = time.time() - self.start_time
+        prefix = f"[{elapsed:06.1f}s] " + (f"[{self.tag}] " if self.tag else "")
+        sys.stdout.write(''.join(f"{prefix}{line}\n" for line in lines))
+    
+    def content_hash(self, *paths, mtimes=()):
+        """Short BLAKE2b digest over file contents plus the mtimes of other inputs"""
+        digest = hashlib.blake2b(digest_size=8)
+        for path in paths:
+            digest.update(Path(path).read_bytes())
+        for path in mtimes:
+            digest.update(f"{path}:{Path(path).stat().st_mtime_ns}".encode())
+        return digest.hexdigest()
+    
+    def _load_json_cached(self, path):
+        """Parse a JSON file once per version; the result is shared and must not be mutated"""
+        stat = Path(path).stat()
+        cached = self._json_cache.get(str(path))
+        if cached and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+            return cached[2]
+        
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        self._json_cache[str(path)] = (stat.st_mtime_ns, stat.st_size, data)
+        return data
+    
+    def is_up_to_date(self, output_path, sidecar, digest):
+        """True if the output exists and was produced from inputs with this digest"""
+        if self.force or not output_path.exists():
+            return False
+        try:
+            return sidecar.read_text().strip() == digest
+        except FileNotFoundError:
+            return False
+    
+    def _call_entry_point(self, entry_point, args, output):
+        """Worker-thread body of run_in_process"""
+        if self.verbose:
+            return entry_point(args)
+        
+        # to_thread runs this in a copy of the caller's context, so the capture stays local
+        _captured_output.set(output)
+        return entry_point(args)
+    
+    async def run_in_process(self, script_name, entry_point, args, step_name):
+        """
+        Call a step's main(argv) directly, capturing its output unless verbose.
+        It runs on a worker thread so other pipelines in a batch keep recording and
+        encoding while this one converts content or waits on Polly.
+        """
+        self.log(f"🚀 Running: {script_name} {' '.join(args)} (in-process)", step_name)
+        
+        install_output_routing()
+        
+        output = io.StringIO()
+        try:
+            exit_code = await asyncio.to_thread(self._call_entry_point, entry_point, args, output)
+        except Exception as e:
+            self.log(f"❌ Error running {script_name}: {e}", step_name)
+            return False
+        
+        success = exit_code == 0
+        if success:
+            self.log(f"✅ {script_name} completed successfully", step_name)
+        else:
+            self.log(f"❌ {script_name} failed:", step_name)
+            self.log(f"   OUTPUT: {output.getvalue()}")
+        
+        return success
+    
+    async def run_command(self, cmd):
+        """Run an external command without blocking the event loop"""
+        process = await asyncio.create_subprocess_exec(
+            *cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE)
+        stdout, stderr = await process.communicate()
+        return process.returncode, stdout.decode(errors='replace'), stderr.decode(errors='replace')
+    
+    async def run_ffmpeg(self, cmd, duration=None):
+        """
+        Run an FFmpeg command with machine-readable progress on stdout, logging every
+        10% when the output duration is known. Only the tail of stderr is kept.
+        Returns (returncode, stderr tail).
+        """
+        process = await asyncio.create_subprocess_exec(
+            cmd[0], '-progress', 'pipe:1', *cmd[1:],
+            stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE)
+        stderr_tail = collections.deque(maxlen=50)
+        
+        async def drain_stderr():
+            async for line in process.stderr:
+                stderr_tail.append(line.decode(errors='replace').rstrip())
+        
+        async def follow_progress():
+            next_report = 10
+            async for line in process.stdout:
+                key, _, value = line.decode(errors='replace').strip().partition('=')
+                # out_time_ms is in microseconds too; older FFmpeg only emits that one
+                if key not in ('out_time_us', 'out_time_ms') or not duration or not value.isdigit():
+                    continue
+                percent = int(value) / 1e6 / duration * 100
+                if percent >= next_report:
+                    self.log(f"   ⏳ {min(percent, 100):.0f}% encoded")
+                    next_report = (percent // 10 + 1) * 10
+        
+        await asyncio.gather(drain_stderr(), follow_progress())
+        await process.wait()
+        return process.returncode, '\n'.join(stderr_tail)
+    
+    def get_final_video_options(self, video_codec):
+        """
+        Video codec arguments to try in order for the final MP4: a stream copy when
+        the synced video is already H.264, else a hardware encoder (if any) then libx264.
+        """
+        if video_codec == 'h264':
+            return [['-c:v', 'copy']]
+        
+        libx264_args = ['-c:v', 'libx264', '-preset', 'veryfast', '-tune', 'stillimage', '-crf', '23']
+        encoder = pick_video_encoder()
+        if encoder == 'libx264':
+            return [libx264_args]
+        # A compiled-in hardware encoder can still fail without a device
+        return [['-c:v', encoder, *HARDWARE_ENCODERS[encoder]], libx264_args]
+    
+    async def probe_codecs(self, media_path):
+        """Map codec_type -> codec_name of the first stream of each type, from one ffprobe call"""
+        try:
+            returncode, stdout, _ = await self.run_command([
+                'ffprobe', '-v', 'error', '-show_entries', 'stream=codec_type,codec_name',
+                '-of', 'json', str(media_path)
+            ])
+        except FileNotFoundError:
+            return {}
+        if returncode != 0:
+            return {}
+        
+        codecs = {}
+        for stream in json.loads(stdout).get('streams', []):
+            codecs.setdefault(stream.get('codec_type'), stream.get('codec_name'))
+        return codecs
+    
+    async def run_script(self, script_name, args, step_name):
         """Run a Python script and handle errors"""
+        entry_point = self.entry_points.get(script_name)
+        if entry_point is not None:
+            return await self.run_in_process(script_name, entry_point, args, step_name)
+        
         script_path = Path('scripts') / script_name
         if not script_path.exists():
             self.log(f"❌ Script not found: {script_path}", step_name)
@@ -47,24 +292,31 @@ class SynchronizedPipeline:
         
         try:
             if self.verbose:
-                # Show real-time output
-                process = subprocess.Popen(cmd, stdout=subprocess.PIPE, 
-                                         stderr=subprocess.STDOUT, text=True)
+                # Show real-time output; unbuffered so the child's lines arrive as written
+                process = await asyncio.create_subprocess_exec(
+                    *cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.STDOUT,
+                    env={**os.environ, 'PYTHONUNBUFFERED': '1'})
                 
-                for line in process.stdout:
-                    print(f"   {line.rstrip()}")
+                # Read in large chunks and write each batch of complete lines at once
+                pending = b''
+                while chunk := await process.stdout.read(65536):
+                    lines = (pending + chunk).split(b'\n')
+                    pending = lines.pop()
+                    sys.stdout.write(''.join(f"   {line.decode(errors='replace').rstrip()}\n" for line in lines))
+                if pending:
+                    print(f"   {pending.decode(errors='replace').rstrip()}")
                 
-                process.wait()
+                await process.wait()
                 success = process.returncode == 0
             else:
                 # Capture output
-                result = subprocess.run(cmd, capture_output=True, text=True)
-                success = result.returncode == 0
+                returncode, stdout, stderr = await self.run_command(cmd)
+                success = returncode == 0
                 
                 if not success:
                     self.log(f"❌ {script_name} failed:", step_name)
-                    self.log(f"   STDOUT: {result.stdout}")
-                    self.log(f"   STDERR: {result.stderr}")
+                    self.log(f"   STDOUT: {stdout}")
+                    self.log(f"   STDERR: {stderr}")
             
             if success:
                 self.log(f"✅ {script_name} completed successfully", step_name)
@@ -75,6 +327,36 @@ class SynchronizedPipeline:
             self.log(f"❌ Error running {script_name}: {e}", step_name)
             return False
     
+    async def record_in_process(self, production_json, audio_dir, video_file, step_name):
+        """Record step 3 with the batch's shared browser instead of a new recorder process"""
+        from generate_video_synchronized import TimingCalibratedVideoGenerator
+        
+        self.log(f"🚀 Recording: {production_json} (in-process, shared browser)", step_name)
+        install_output_routing()
+        
+        output = io.StringIO()
+        
+        async def record():
+            # Runs as its own task, so the capture doesn't leak into this pipeline's context
+            if not self.verbose:
+                _captured_output.set(output)
+            return await TimingCalibratedVideoGenerator().record_calibrated_video(
+                production_json, audio_dir, output_path=video_file, browser=self.browser)
+        
+        try:
+            recorded = await asyncio.create_task(record())
+        except Exception as e:
+            self.log(f"❌ Error recording {production_json}: {e}", step_name)
+            return False
+        
+        if not recorded:
+            self.log("❌ Recording failed:", step_name)
+            self.log(f"   OUTPUT: {output.getvalue()}")
+            return False
+        
+        self.log("✅ Recording completed successfully", step_name)
+        return True
+    
     def validate_timing_synchronization(self, audio_dir, video_path):
         """
         Validate that audio and video timing are properly synchronized.
@@ -83,13 +365,11 @@ class SynchronizedPipeline:
         
         # Load audio sequence
         sequence_file = Path(audio_dir) / 'audio_sequence.json'
-        if not sequence_file.exists():
+        try:
+            audio_sequence = self._load_json_cached(sequence_file)
+        except FileNotFoundError:
             self.log(f"❌ Audio sequence not found: {sequence_file}")
             return False
-        
-        try:
-            with open(sequence_file, 'r') as f:
-                audio_sequence = json.load(f)
         except Exception as e:
             self.log(f"❌ Error loading audio sequence: {e}")
             return False
@@ -112,9 +392,11 @@ class SynchronizedPipeline:
             return False
         
         # Validate step timing
-        self.log(f"📊 Timing validation:")
-        self.log(f"   Total duration: {total_duration:.1f}s")
-        self.log(f"   Sequence steps: {len(sequence_steps)}")
+        report = [
+            "📊 Timing validation:",
+            f"   Total duration: {total_duration:.1f}s",
+            f"   Sequence steps: {len(sequence_steps)}"
+        ]
         
         # Check for timing gaps or overlaps
         previous_end = 0
@@ -136,16 +418,15 @@ class SynchronizedPipeline:
             previous_end = start_time + duration
             
             if i < 5:  # Show first 5 steps
-                self.log(f"   {i+1:2}. {start_time:6.1f}s: {step_type:12} ({duration:.1f}s)")
+                report.append(f"   {i+1:2}. {start_time:6.1f}s: {step_type:12} ({duration:.1f}s)")
         
         if timing_issues:
-            self.log("⚠️ Timing issues detected:")
-            for issue in timing_issues[:3]:  # Show first 3 issues
-                self.log(f"   {issue}")
+            report.append("⚠️ Timing issues detected:")
+            report.extend(f"   {issue}" for issue in timing_issues[:3])  # Show first 3 issues
             if len(timing_issues) > 3:
-                self.log(f"   ... and {len(timing_issues) - 3} more issues")
+                report.append(f"   ... and {len(timing_issues) - 3} more issues")
         else:
-            self.log("✅ No timing issues detected")
+            report.append("✅ No timing issues detected")
         
         # Check final timing
         expected_end = total_duration
@@ -153,31 +434,37 @@ class SynchronizedPipeline:
         timing_drift = abs(actual_end - expected_end)
         
         if timing_drift > 1.0:  # 1 second tolerance
-            self.log(f"⚠️ Timing drift: {timing_drift:.1f}s (expected: {expected_end:.1f}s, actual: {actual_end:.1f}s)")
+            report.append(f"⚠️ Timing drift: {timing_drift:.1f}s (expected: {expected_end:.1f}s, actual: {actual_end:.1f}s)")
         else:
-            self.log(f"✅ Timing drift within tolerance: {timing_drift:.1f}s")
+            report.append(f"✅ Timing drift within tolerance: {timing_drift:.1f}s")
         
+        self.log_block(report)
         return len(timing_issues) == 0 and timing_drift <= 1.0
     
     def analyze_audio_structure(self, audio_dir):
         """Analyze the audio structure for debugging"""
         self.log("🔍 Analyzing audio structure...")
         
-        audio_files = list(Path(audio_dir).glob('*.mp3'))
+        required_files = ['intro.mp3', 'instructions.mp3', 'outro.mp3']
+        
+        # One directory read; only the required clips are stat'ed, for their sizes
+        with os.scandir(audio_dir) as entries:
+            audio_files = {entry.name: entry for entry in entries if entry.name.endswith('.mp3')}
+            required_sizes = {name: audio_files[name].stat().st_size
+                              for name in required_files if name in audio_files}
+        self.audio_file_count = len(audio_files)  # Reused by the completion report
         self.log(f"🔍 Found {len(audio_files)} audio files:")
         
-        required_files = ['intro.mp3', 'instructions.mp3', 'outro.mp3']
         for file_name in required_files:
-            file_path = Path(audio_dir) / file_name
-            if file_path.exists():
-                size = file_path.stat().st_size / 1024  # KB
+            if file_name in required_sizes:
+                size = required_sizes[file_name] / 1024  # KB
                 self.log(f"   ✅ {file_name} ({size:.1f} KB)")
             else:
                 self.log(f"   ❌ {file_name} (missing)")
         
         # Check for text and question files
-        text_files = [f for f in audio_files if f.name.startswith('text_')]
-        question_files = [f for f in audio_files if f.name.startswith('question_')]
+        text_files = [name for name in audio_files if name.startswith('text_')]
+        question_files = [name for name in audio_files if name.startswith('question_')]
         
         self.log(f"🔍 Text files: {len(text_files)}")
         self.log(f"❓ Question files: {len(question_files)}")
@@ -189,7 +476,54 @@ class SynchronizedPipeline:
         
         return len(text_files) == 5 and len(question_files) == 5
     
-    def check_prerequisites(self):
+    async def check_ffmpeg(self):
+        """
+        (ok, log lines) for the FFmpeg binary. A binary that already ran is remembered
+        by path and mtime in PREREQ_CACHE, so later runs skip the `ffmpeg -version` spawn.
+        """
+        ffmpeg_path = shutil.which('ffmpeg')
+        if ffmpeg_path is None:
+            return False, ["   ❌ ffmpeg not found - please install FFmpeg"]
+        
+        key = f"{ffmpeg_path}:{os.stat(ffmpeg_path).st_mtime_ns}"
+        try:
+            cache = json.loads(PREREQ_CACHE.read_text())
+        except (FileNotFoundError, ValueError):
+            cache = {}
+        if cache.get('ffmpeg') == key:
+            return True, ["   ✅ ffmpeg"]
+        
+        try:
+            returncode, _, _ = await self.run_command([ffmpeg_path, '-version'])
+        except OSError:
+            returncode = None
+        if returncode != 0:
+            return False, ["   ❌ ffmpeg not working properly"]
+        
+        try:
+            PREREQ_CACHE.parent.mkdir(parents=True, exist_ok=True)
+            PREREQ_CACHE.write_text(json.dumps({**cache, 'ffmpeg': key}))
+        except OSError:
+            pass  # Caching is best effort
+        return True, ["   ✅ ffmpeg"]
+    
+    def check_polly_access(self):
+        """(ok, log lines) for AWS credentials; a blocking round-trip, so run it on a thread"""
+        try:
+            if 'generate_audio.py' in self.entry_points:
+                # Warm up the client the in-process audio step will reuse
+                from generate_audio import get_polly_client
+                client = get_polly_client()
+            else:
+                import boto3
+                client = boto3.session.Session().client('polly', region_name='us-east-1')
+            # Test connection
+            client.describe_voices(LanguageCode='de-DE')
+        except Exception as e:
+            return False, [f"   ❌ AWS/Polly access issue: {e}", "   💡 Run: aws configure"]
+        return True, ["   ✅ AWS credentials and Polly access"]
+    
+    async def check_prerequisites(self):
         """Check that all required files and dependencies exist"""
         self.log("🔍 Checking prerequisites...")
         
@@ -208,16 +542,13 @@ class SynchronizedPipeline:
             self.log("   ❌ playwright - run: pip install playwright && playwright install chromium")
             return False
         
-        # Check for FFmpeg
-        try:
-            result = subprocess.run(['ffmpeg', '-version'], capture_output=True)
-            if result.returncode == 0:
-                self.log("   ✅ ffmpeg")
-            else:
-                self.log("   ❌ ffmpeg not working properly")
-                return False
-        except FileNotFoundError:
-            self.log("   ❌ ffmpeg not found - please install FFmpeg")
+        # FFmpeg spawn and the Polly round-trip dominate, so run them side by side
+        (ffmpeg_ok, ffmpeg_lines), (polly_ok, polly_lines) = await asyncio.gather(
+            self.check_ffmpeg(), asyncio.to_thread(self.check_polly_access))
+        
+        for line in ffmpeg_lines:
+            self.log(line)
+        if not ffmpeg_ok:
             return False
         
         # Check required scripts
@@ -225,11 +556,20 @@ class SynchronizedPipeline:
             'scripts/convert_content.py',
             'scripts/generate_audio.py'
         ]
+        video_scripts = ['generate_video_synchronized.py', 'generate_video.py']
+        intro_file = Path('assets/standard-audio/intro.mp3')
+        outro_file = Path('assets/standard-audio/outro.mp3')
+        
+        # One directory read per parent instead of a stat per candidate
+        existing = list_existing([
+            *required_scripts, *(f'scripts/{name}' for name in video_scripts),
+            *TEMPLATE_PATHS, str(intro_file), str(outro_file)
+        ])
         
         # Check for video generation script (either name)
         video_script_found = False
-        for script_name in ['generate_video_synchronized.py', 'generate_video.py']:
-            if Path(f'scripts/{script_name}').exists():
+        for script_name in video_scripts:
+            if f'scripts/{script_name}' in existing:
                 self.log(f"   ✅ {script_name}")
                 video_script_found = True
                 break
@@ -240,7 +580,7 @@ class SynchronizedPipeline:
         
         missing_files = []
         for script_path in required_scripts:
-            if Path(script_path).exists():
+            if script_path in existing:
                 self.log(f"   ✅ {Path(script_path).name}")
             else:
                 missing_files.append(script_path)
@@ -252,17 +592,9 @@ class SynchronizedPipeline:
             return False
         
         # Check for templates
-        template_paths = [
-            'templates/base/teil1_flexible.html',
-            'templates/base/teil1_base.html',
-            'templates/themed/teil1_energetic.html',
-            'templates/themed/teil1_professional.html',
-            'templates/styles/teil1_current.html'
-        ]
-        
         template_found = False
-        for template in template_paths:
-            if Path(template).exists():
+        for template in TEMPLATE_PATHS:
+            if template in existing:
                 self.log(f"   ✅ {template}")
                 template_found = True
                 break
@@ -273,37 +605,28 @@ class SynchronizedPipeline:
             return False
         
         # Check intro/outro audio files
-        intro_file = Path('assets/standard-audio/intro.mp3')
-        outro_file = Path('assets/standard-audio/outro.mp3')
-        
-        if intro_file.exists():
+        if str(intro_file) in existing:
             self.log("   ✅ intro.mp3")
         else:
             self.log(f"   ❌ intro.mp3 not found: {intro_file}")
             return False
             
-        if outro_file.exists():
+        if str(outro_file) in existing:
             self.log("   ✅ outro.mp3")
         else:
             self.log(f"   ❌ outro.mp3 not found: {outro_file}")
             return False
         
         # Check AWS credentials
-        try:
-            import boto3
-            client = boto3.client('polly', region_name='us-east-1')
-            # Test connection
-            client.describe_voices(LanguageCode='de-DE')
-            self.log("   ✅ AWS credentials and Polly access")
-        except Exception as e:
-            self.log(f"   ❌ AWS/Polly access issue: {e}")
-            self.log("   💡 Run: aws configure")
+        for line in polly_lines:
+            self.log(line)
+        if not polly_ok:
             return False
         
         self.log("✅ All prerequisites met")
         return True
     
-    async def run_synchronized_pipeline(self, user_json_path, output_name=None):
+    async def run_synchronized_pipeline(self, user_json_path, output_name=None, check_prereqs=True):
         """Run the complete synchronized pipeline"""
         user_json_path = Path(user_json_path)
         
@@ -315,8 +638,8 @@ class SynchronizedPipeline:
         self.log("=" * 60)
         self.log(f"🔍 Input: {user_json_path}")
         
-        # Check prerequisites
-        if not self.check_prerequisites():
+        # Check prerequisites (batch runs check once up front)
+        if check_prereqs and not await self.check_prerequisites():
             return False
         
         # Create directories
@@ -347,30 +670,50 @@ class SynchronizedPipeline:
             # Step 1: Convert user JSON to production JSON
             self.log("", "step1")
             self.log("📄 STEP 1: Converting user content to production format")
-            success = self.run_script('convert_content.py', [str(user_json_path)], "step1")
-            if not success:
-                return False
             
             production_json = Path(f'content/teil1/production-ready/{production_base_name}.json')
-            if not production_json.exists():
-                self.log(f"❌ Production JSON not created: {production_json}")
-                return False
+            production_hash_file = production_json.with_suffix('.json.hash')
+            user_hash = self.content_hash(user_json_path, mtimes=['scripts/convert_content.py'])
+            
+            if self.is_up_to_date(production_json, production_hash_file, user_hash):
+                self.log("⏭️ Production JSON is up to date, skipping conversion", "step1")
+            else:
+                success = await self.run_script('convert_content.py', [str(user_json_path)], "step1")
+                if not success:
+                    return False
+                
+                if not production_json.exists():
+                    self.log(f"❌ Production JSON not created: {production_json}")
+                    return False
+                production_hash_file.write_text(user_hash)
             
             # Step 2: Generate synchronized audio files
             self.log("", "step2")
             self.log("🎵 STEP 2: Generating synchronized German audio with Amazon Polly")
-            success = self.run_script('generate_audio.py', [str(production_json)], "step2")
-            if not success:
-                return False
             
-            # Verify audio files and analyze structure
             audio_dir = Path(f'output/audio/{production_base_name}')
-            if not audio_dir.exists():
-                self.log(f"❌ Audio directory not created: {audio_dir}")
-                return False
+            audio_hash_file = audio_dir / 'audio_sequence.json.hash'
+            production_hash = self.content_hash(
+                production_json,
+                mtimes=[*list_existing(TEIL_CONFIG_PATHS), 'scripts/generate_audio.py']
+            )
+            
+            if self.is_up_to_date(audio_dir / 'audio_sequence.json', audio_hash_file, production_hash):
+                self.log("⏭️ Audio is up to date, skipping synthesis", "step2")
+            else:
+                success = await self.run_script('generate_audio.py', [str(production_json)], "step2")
+                if not success:
+                    return False
+                
+                # Verify audio files
+                if not audio_dir.exists():
+                    self.log(f"❌ Audio directory not created: {audio_dir}")
+                    return False
+                audio_hash_file.write_text(production_hash)
             
             # Analyze audio structure
-            if not self.analyze_audio_structure(audio_dir):
+            # Directory I/O runs off the event loop so other pipelines in a batch keep going
+            if not await asyncio.to_thread(self.analyze_audio_structure, audio_dir):
                 self.log("⚠️ Audio structure issues detected, but continuing...")
             
             # Step 3: Generate synchronized video
@@ -383,30 +726,31 @@ class SynchronizedPipeline:
                 self.log("⚠️ Synchronized video generator not found, using standard generator")
                 video_script = 'generate_video.py'
             
-            success = self.run_script(video_script, [str(production_json)], "step3")
-            if not success:
-                return False
+            # The recorder is told where to write, so there is nothing to search for
+            video_file = Path(f'output/videos/{output_name}_calibrated.webm')
+            video_hash_file = video_file.with_suffix('.webm.hash')
             
-            # Verify video was created (try both possible names)
-            possible_video_files = [
-                Path(f'output/videos/{output_name}.webm'),
-                Path(f'output/videos/{production_base_name}.webm'),
-                Path(f'output/videos/{user_json_path.stem}.webm'),
-                Path(f'output/videos/{output_name}_calibrated.webm'),
-                Path(f'output/videos/{user_json_path.stem}_calibrated.webm')
-            ]
-            
-            video_file = None
-            for possible_file in possible_video_files:
-                if possible_file.exists():
-                    video_file = possible_file
-                    break
-            
-            if not video_file:
-                self.log(f"❌ Video file not created. Checked:")
-                for possible_file in possible_video_files:
-                    self.log(f"   {possible_file}")
-                return False
+            # Video timing follows the audio sequence, and its look follows the templates
+            video_hash = self.content_hash(
+                production_json, audio_dir / 'audio_sequence.json',
+                mtimes=[*sorted(list_existing(TEMPLATE_PATHS)), f'scripts/{video_script}']
+            )
+            
+            if self.is_up_to_date(video_file, video_hash_file, video_hash):
+                self.log(f"⏭️ Video is up to date, skipping recording: {video_file}", "step3")
+            else:
+                if self.browser is not None:
+                    success = await self.record_in_process(production_json, audio_dir, video_file, "step3")
+                else:
+                    video_args = [str(production_json), '--output', str(video_file)]
+                    success = await self.run_script(video_script, video_args, "step3")
+                if not success:
+                    return False
+                
+                if not video_file.exists():
+                    self.log(f"❌ Video file not created: {video_file}")
+                    return False
+                video_hash_file.write_text(video_hash)
             
             self.log(f"✅ Video created: {video_file}")
             
@@ -424,76 +768,89 @@ class SynchronizedPipeline:
             self.log("", "step5")
             self.log("🎵 STEP 5: Synchronizing audio with video using sync_audio_video.py")
             
-            # Pass the actual video file path to the sync script
-            sync_args = [str(production_json), '--video-file', str(video_file)]
-            success = self.run_script('sync_audio_video.py', sync_args, "step5")
-            if not success:
-                self.log("❌ Audio-video synchronization failed")
-                return False
-            
-            # Find the synced video file (check possible output names)
-            possible_synced_files = [
-                Path(f'output/videos/{output_name}_synced.webm'),
-                Path(f'output/videos/{production_base_name}_synced.webm'),
-                Path(f'output/videos/{user_json_path.stem}_synced.webm'),
-                Path(f'output/videos/{output_name}.webm'),  # Might overwrite original
-                video_file  # Fallback to original if sync script doesn't create new file
-            ]
-            
-            synced_video = None
-            for possible_file in possible_synced_files:
-                if possible_file.exists():
-                    # Check if this file has audio
-                    try:
-                        result = subprocess.run(['ffprobe', '-v', 'quiet', '-select_streams', 'a', 
-                                               '-show_entries', 'stream=index', '-of', 'csv=p=0', 
-                                               str(possible_file)], capture_output=True, text=True)
-                        has_audio = bool(result.stdout.strip())
-                        if has_audio:
-                            synced_video = possible_file
-                            self.log(f"✅ Found synced video with audio: {synced_video}")
-                            break
-                    except:
-                        continue
-            
-            if not synced_video:
-                self.log("❌ No synced video with audio found")
-                self.log("💡 Available video files:")
-                for possible_file in possible_synced_files:
-                    if possible_file.exists():
-                        self.log(f"   {possible_file} (exists)")
-                return False
-            
-            video_file = synced_video  # Use synced video for final conversion
-
-            # Step 6: Convert to final MP4
-            self.log("", "step6")
-            self.log("🎞️ STEP 6: Converting synced video to final MP4")
-
+            # The sync step mixes and muxes to H.264/AAC MP4 with +faststart, so it
+            # writes the final video directly instead of an intermediate for step 6
             final_video = Path(f'output/final/{output_name}_final.mp4')
             final_video.parent.mkdir(parents=True, exist_ok=True)
-
-            cmd = [
-                'ffmpeg', '-i', str(video_file), 
-                '-c:v', 'libx264', '-c:a', 'aac',
-                '-y', str(final_video)
-            ]
-
+            
+            # Load audio sequence for duration info (progress and the final report)
             try:
-                self.log(f"   Running: ffmpeg conversion")
-                result = subprocess.run(cmd, capture_output=True, text=True)
-                success = result.returncode == 0
+                audio_info = self._load_json_cached(audio_dir / 'audio_sequence.json')
+                expected_duration = audio_info.get('total_duration', 0)
+            except:
+                expected_duration = 0
+            
+            # The final video depends on the recording, the sequence and its clips, and the sync code
+            final_hash_file = final_video.with_suffix('.mp4.hash')
+            final_hash = self.content_hash(
+                audio_dir / 'audio_sequence.json',
+                mtimes=[video_file, *sorted(audio_dir.glob('*.mp3')),
+                        *sorted(list_existing(STANDARD_AUDIO_PATHS)), 'scripts/sync_audio_video.py']
+            )
+            
+            if self.is_up_to_date(final_video, final_hash_file, final_hash):
+                self.log("⏭️ Final video is up to date, skipping sync and conversion", "step5")
+            else:
+                # Pass the actual video file path to the sync script
+                sync_args = [str(production_json), '--video-file', str(video_file), '--output', str(final_video)]
+                success = await self.run_script('sync_audio_video.py', sync_args, "step5")
                 if not success:
-                    self.log(f"❌ FFmpeg conversion failed: {result.stderr}")
+                    self.log("❌ Audio-video synchronization failed")
                     return False
+                
+                if not final_video.exists():
+                    self.log(f"❌ Synced video not created: {final_video}")
+                    return False
+                
+                # One probe; its codecs also decide whether step 6 has anything to do
+                synced_codecs = await self.probe_codecs(final_video)
+                if 'audio' not in synced_codecs:
+                    self.log(f"❌ Synced video has no audio track: {final_video}")
+                    return False
+                self.log(f"✅ Synced video with audio: {final_video}")
+
+                # Step 6: Convert to final MP4
+                self.log("", "step6")
+                self.log("🎞️ STEP 6: Converting synced video to final MP4")
+                
+                if synced_codecs.get('video') == 'h264' and synced_codecs.get('audio') == 'aac':
+                    self.log("⏭️ Sync step wrote an H.264/AAC MP4, no conversion needed", "step6")
                 else:
-                    self.log("✅ FFmpeg conversion successful")
-            except Exception as e:
-                self.log(f"❌ FFmpeg error: {e}")
-                return False
-            
-            # Verify final video was created
-            if not final_video.exists():
+                    # Convert next to the synced file, then swap it into place
+                    converted_video = final_video.with_name(f"{final_video.stem}.converting.mp4")
+                    audio_args = ['-c:a', 'copy'] if synced_codecs.get('audio') == 'aac' else ['-c:a', 'aac']
+                    
+                    try:
+                        for video_args in self.get_final_video_options(synced_codecs.get('video')):
+                            cmd = [
+                                'ffmpeg', '-hide_banner', '-nostats', '-loglevel', 'error',
+                                '-i', str(final_video),
+                                *video_args, *audio_args,
+                                '-movflags', '+faststart',
+                                '-y', str(converted_video)
+                            ]
+                            
+                            self.log(f"   Running: ffmpeg conversion ({video_args[1]})")
+                            returncode, stderr = await self.run_ffmpeg(cmd, expected_duration)
+                            if returncode == 0:
+                                break
+                            self.log(f"⚠️ {video_args[1]} failed: {stderr}")
+                        else:
+                            self.log("❌ FFmpeg conversion failed")
+                            converted_video.unlink(missing_ok=True)
+                            return False
+                        os.replace(converted_video, final_video)
+                        self.log("✅ FFmpeg conversion successful")
+                    except Exception as e:
+                        self.log(f"❌ FFmpeg error: {e}")
+                        return False
+                    
+                final_hash_file.write_text(final_hash)
+            
+            # Verify final video was created; the same stat gives its size
+            try:
+                file_size = final_video.stat().st_size / (1024 * 1024)  # MB
+            except FileNotFoundError:
                 self.log(f"❌ Final video not created: {final_video}")
                 self.log("💡 Checking what files exist in output/final/:")
                 final_dir = Path('output/final')
@@ -508,32 +865,23 @@ class SynchronizedPipeline:
                     self.log("   Directory doesn't exist")
                 return False
             
-            # Get final video file size
-            file_size = final_video.stat().st_size / (1024 * 1024)  # MB
-            
-            # Load audio sequence for duration info
-            try:
-                sequence_file = audio_dir / 'audio_sequence.json'
-                with open(sequence_file, 'r') as f:
-                    audio_info = json.load(f)
-                expected_duration = audio_info.get('total_duration', 0)
-            except:
-                expected_duration = 0
-            
+            total_time = time.time() - self.start_time
             self.log("", "complete")
-            self.log("🎉 SYNCHRONIZED PIPELINE COMPLETE!")
-            self.log("=" * 60)
-            self.log(f"✅ Final video: {final_video}")
-            self.log(f"📊 File size: {file_size:.1f} MB")
-            self.log(f"⏱️ Expected duration: {expected_duration:.1f}s ({expected_duration/60:.1f} min)")
-            self.log(f"🕒 Processing time: {total_time:.1f}s ({total_time/60:.1f} min)")
-            self.log(f"🎬 Perfect for YouTube upload!")
-            
-            # Additional success metrics
-            self.log("\n📈 Quality Metrics:")
-            self.log(f"   🎵 Audio files: {len(list(audio_dir.glob('*.mp3')))} generated")
-            self.log(f"   🎬 Video synchronization: {'✅ Validated' if sync_valid else '⚠️ Warning'}")
-            self.log(f"   📊 File efficiency: {file_size/max(expected_duration/60, 1):.1f} MB/min")
+            self.log_block([
+                "🎉 SYNCHRONIZED PIPELINE COMPLETE!",
+                "=" * 60,
+                f"✅ Final video: {final_video}",
+                f"📊 File size: {file_size:.1f} MB",
+                f"⏱️ Expected duration: {expected_duration:.1f}s ({expected_duration/60:.1f} min)",
+                f"🕒 Processing time: {total_time:.1f}s ({total_time/60:.1f} min)",
+                f"🎬 Perfect for YouTube upload!",
+                
+                # Additional success metrics
+                "\n📈 Quality Metrics:",
+                f"   🎵 Audio files: {self.audio_file_count} generated",
+                f"   🎬 Video synchronization: {'✅ Validated' if sync_valid else '⚠️ Warning'}",
+                f"   📊 File efficiency: {file_size/max(expected_duration/60, 1):.1f} MB/min"
+            ])
             
             return True
             
@@ -543,6 +891,57 @@ class SynchronizedPipeline:
             self.log(f"📍 Full traceback: {traceback.format_exc()}")
             return False
     
+    async def process_batch(self, user_files, concurrency=4):
+        """Run the pipeline for several input files, at most `concurrency` at a time"""
+        user_files = sorted(Path(f) for f in user_files)
+        if not user_files:
+            self.log("❌ No input files to process")
+            return {}
+        
+        self.log(f"📦 Batch: {len(user_files)} files, concurrency {concurrency}")
+        if not await self.check_prerequisites():
+            return {str(f): False for f in user_files}
+        
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+        
+        async with contextlib.AsyncExitStack() as stack:
+            # One Chromium for the whole batch; each recording opens its own context
+            browser = None
+            try:
+                from playwright.async_api import async_playwright
+                from generate_video_synchronized import launch_browser
+            except ImportError:
+                self.log("⚠️ Recorder not importable, each file launches its own browser")
+            else:
+                playwright = await stack.enter_async_context(async_playwright())
+                browser = await launch_browser(playwright)
+                stack.push_async_callback(browser.close)
+            
+            async def _bounded(idx, user_file):
+                async with semaphore:
+                    self.log(f"▶️ Processing {user_file.name} ({idx}/{len(user_files)})")
+                    pipeline = SynchronizedPipeline(verbose=self.verbose, tag=user_file.stem,
+                                                    entry_points=self.entry_points, force=self.force,
+                                                    browser=browser)
+                    return await pipeline.run_synchronized_pipeline(user_file, check_prereqs=False)
+            
+            tasks = [asyncio.create_task(_bounded(idx, f)) for idx, f in enumerate(user_files, 1)]
+            outcomes = await asyncio.gather(*tasks, return_exceptions=True)
+        
+        results = {}
+        for user_file, outcome in zip(user_files, outcomes):
+            if isinstance(outcome, Exception):
+                self.log(f"💥 {user_file.name} failed with error: {outcome}")
+                outcome = False
+            results[str(user_file)] = outcome
+        
+        succeeded = sum(1 for ok in results.values() if ok)
+        self.log(f"📦 Batch complete: {succeeded}/{len(results)} succeeded")
+        for user_file, ok in results.items():
+            self.log(f"   {'✅' if ok else '❌'} {user_file}")
+        
+        return results
+    
     def auto_find_production_json(self, user_json_path):
         """Auto-find production JSON from user JSON path"""
         if not user_json_path:
@@ -573,15 +972,24 @@ async def main():
                        help='Show detailed output from all steps')
     parser.add_argument('--check-prereqs', action='store_true',
                        help='Only check prerequisites')
+    parser.add_argument('--force', action='store_true',
+                       help='Re-run every stage even if its inputs are unchanged')
+    parser.add_argument('--input-dir', help='Process every JSON file in this directory')
+    parser.add_argument('--concurrency', type=int, default=4,
+                       help='Maximum files processed at once in batch mode (default: 4)')
     
     args = parser.parse_args()
     
-    pipeline = SynchronizedPipeline(verbose=args.verbose)
+    pipeline = SynchronizedPipeline(verbose=args.verbose, force=args.force)
     
     if args.check_prereqs:
-        success = pipeline.check_prerequisites()
+        success = await pipeline.check_prerequisites()
         sys.exit(0 if success else 1)
     
+    if args.input_dir:
+        results = await pipeline.process_batch(find_user_files(args.input_dir), args.concurrency)
+        sys.exit(0 if results and all(results.values()) else 1)
+    
     if not args.input_file:
         print("❌ Input file required")
         print("💡 Usage: python synchronized_pipeline.py your_file.json")
@@ -4,35 +4,110 @@ Teil Configuration System for Goethe Video Generation
 Centralized configuration management for different Teil types
 """
 
-import json
-import yaml
+import copy
+import functools
+import os
+import pickle
+import tempfile
 from pathlib import Path
-from typing import Dict, Any, Optional
+from types import MappingProxyType
+from typing import Dict, Any, Mapping, Optional
+
+from _teil_defaults import DEFAULTS
+
+@functools.lru_cache(maxsize=1)
+def _yaml():
+    """Import PyYAML on first use, so runs served from DEFAULTS never load it"""
+    import yaml
+    try:
+        from yaml import CSafeLoader as YamlLoader, CSafeDumper as YamlDumper  # libyaml's C implementation
+    except ImportError:
+        from yaml import SafeLoader as YamlLoader, SafeDumper as YamlDumper
+    return yaml, YamlLoader, YamlDumper
 
 class TeilConfigManager:
     def __init__(self, config_dir: str = 'config/teil'):
         self.config_dir = Path(config_dir)
-        self.config_dir.mkdir(parents=True, exist_ok=True)
+        if not self.config_dir.is_dir():
+            self.config_dir.mkdir(parents=True, exist_ok=True)
+        # Only index the files here; each Teil is parsed on first use
+        self._config_paths = {}
+        with os.scandir(self.config_dir) as entries:
+            for entry in entries:
+                number = entry.name[len('teil'):-len('.yaml')]
+                if entry.name.startswith('teil') and entry.name.endswith('.yaml') and number.isdigit():
+                    self._config_paths[int(number)] = Path(entry.path)
         self._configs = {}
-        self._load_all_configs()
+        self._resolved = {}
+        # Read-only helper views, built once per Teil on first request
+        self._timing_views = {}
+        self._audio_views = {}
+        self._visual_views = {}
+    
+    def load_config(self, teil: int) -> Optional[Dict[str, Any]]:
+        """
+        Load one Teil's configuration once: its YAML file if present, otherwise the
+        built-in default. None if neither exists or the YAML is invalid.
+        """
+        if teil not in self._configs:
+            config = None
+            config_file = self._config_paths.get(teil)
+            if config_file is not None:
+                try:
+                    config = self._load_cached_yaml(config_file)
+                    print(f"Loaded config for Teil {teil}")
+                except Exception as e:
+                    print(f"Error loading {config_file}: {e}")
+            elif teil in DEFAULTS:
+                config = copy.deepcopy(DEFAULTS[teil])
+            self._configs[teil] = config
+        return self._configs[teil]
     
-    def _load_all_configs(self):
-        """Load all Teil configuration files"""
-        for config_file in self.config_dir.glob('teil*.yaml'):
-            teil_num = int(config_file.stem.replace('teil', ''))
+    def _load_cached_yaml(self, config_file: Path) -> Any:
+        """
+        Parse a YAML file, reusing a pickle of the previous parse from .cache/ while
+        the source's mtime and size are unchanged.
+        """
+        stat = config_file.stat()
+        key = (stat.st_mtime_ns, stat.st_size)
+        cache_file = self.config_dir / '.cache' / f'{config_file.stem}.pkl'
+        
+        try:
+            with open(cache_file, 'rb') as f:
+                cached_key, config = pickle.load(f)
+            if cached_key == key:
+                return config
+        except Exception:
+            pass  # Missing or unreadable cache; parse the YAML
+        
+        # One contiguous buffer for libyaml's reader; it detects the UTF-8 encoding itself
+        yaml, YamlLoader, _ = _yaml()
+        config = yaml.load(config_file.read_bytes(), Loader=YamlLoader)
+        
+        try:
+            cache_file.parent.mkdir(exist_ok=True)
+            # Unique per writer, so concurrent threads never share a partial file
+            fd, partial_name = tempfile.mkstemp(suffix='.tmp', dir=cache_file.parent)
             try:
-                with open(config_file, 'r', encoding='utf-8') as f:
-                    self._configs[teil_num] = yaml.safe_load(f)
-                print(f"Loaded config for Teil {teil_num}")
-            except Exception as e:
-                print(f"Error loading {config_file}: {e}")
+                with os.fdopen(fd, 'wb') as f:
+                    pickle.dump((key, config), f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(partial_name, cache_file)
+            except BaseException:
+                os.unlink(partial_name)
+                raise
+        except OSError:
+            pass  # Caching is best effort
+        return config
     
     def get_config(self, teil: int) -> Dict[str, Any]:
-        """Get configuration for a specific Teil"""
-        if teil not in self._configs:
-            print(f"Warning: No config found for Teil {teil}, using Teil 1 defaults")
-            return self._configs.get(1, self._get_default_config())
-        return self._configs[teil]
+        """Get configuration for a specific Teil, warning once if it falls back"""
+        if teil not in self._resolved:
+            config = self.load_config(teil)
+            if config is None:
+                print(f"Warning: No config found for Teil {teil}, using Teil 1 defaults")
+                config = self.load_config(1) or self._get_default_config()
+            self._resolved[teil] = config
+        return self._resolved[teil]
     
     def get_timing_config(self, teil: int) -> Dict[str, float]:
         """Get timing configuration for a Teil"""
@@ -54,6 +129,47 @@ class TeilConfigManager:
         config = self.get_config(teil)
         return config.get('structure', {})
     
+    def get_timing_view(self, teil: int) -> Mapping[str, float]:
+        """Timing settings with the audio generator's fallbacks filled in (read-only)"""
+        if teil not in self._timing_views:
+            timing = self.get_timing_config(teil)
+            self._timing_views[teil] = MappingProxyType({
+                'thinking_time': timing.get('thinking_time', 5.0),
+                'pause_between_plays': timing.get('pause_between_plays', 3.0),
+                'transition_duration': timing.get('transition_duration', 2.5),
+                'answer_reveal_pause': timing.get('answer_reveal_pause', 2.0),
+                'task_setup_pause': timing.get('task_setup_pause', 0.5)
+            })
+        return self._timing_views[teil]
+    
+    def get_audio_view(self, teil: int) -> Mapping[str, Any]:
+        """Audio settings with the audio generator's fallbacks filled in (read-only)"""
+        if teil not in self._audio_views:
+            audio = self.get_audio_config(teil)
+            self._audio_views[teil] = MappingProxyType({
+                'text_play_count': audio.get('text_play_count', 2),
+                'question_play_count': audio.get('question_play_count', 1),
+                'engine_hierarchy': tuple(audio.get('engine_hierarchy', ['generative', 'neural', 'standard'])),
+                'voice_preferences': MappingProxyType(audio.get('voice_preferences', {})),
+                'sample_rate': audio.get('sample_rate', '22050'),
+                'format': audio.get('format', 'mp3')
+            })
+        return self._audio_views[teil]
+    
+    def get_visual_view(self, teil: int) -> Mapping[str, Any]:
+        """Visual settings with the video generator's fallbacks filled in (read-only)"""
+        if teil not in self._visual_views:
+            visual = self.get_visual_config(teil)
+            self._visual_views[teil] = MappingProxyType({
+                'base_template': visual.get('base_template', f'teil{teil}_base.html'),
+                'theme': visual.get('default_theme', 'energetic'),
+                'available_themes': tuple(visual.get('available_themes', ['energetic'])),
+                'show_progress_bar': visual.get('show_progress_bar', True),
+                'transition_animations': visual.get('transition_animations', True),
+                'content_display_mode': visual.get('content_display_mode', 'combined')
+            })
+        return self._visual_views[teil]
+    
     def _get_default_config(self) -> Dict[str, Any]:
         """Fallback default configuration"""
         return {
@@ -77,337 +193,52 @@ def create_teil_configs():
     """Create all Teil configuration files"""
     config_dir = Path('config/teil')
     config_dir.mkdir(parents=True, exist_ok=True)
-    
-    configs = {
-        1: {
-            'name': 'Teil 1 - Short Monologues',
-            'description': 'Five short texts with multiple choice questions',
-            
-            'timing': {
-                # Core timing
-                'thinking_time': 5.0,          # User preference: shortened from 25s
-                'pause_between_plays': 3.0,    # Pause between first and second play
-                'transition_duration': 2.5,    # Minimum transition time
-                'answer_reveal_pause': 2.0,    # Pause after showing answer
-                
-                # Section-specific timing
-                'intro_duration': 15.0,        # Max intro duration
-                'instructions_pause': 1.0,     # Pause after instructions
-                'outro_duration': 15.0,        # Max outro duration
-                
-                # Task-specific
-                'task_setup_pause': 0.5,       # Brief pause before text starts
-                'question_to_answer_pause': 1.0  # Pause between question and answer reveal
-            },
-            
-            'audio': {
-                # Playback settings
-                'text_play_count': 2,           # Play each text twice
-                'question_play_count': 1,       # Play questions once
-                'instruction_play_count': 1,    # Play instructions once
-                
-                # Voice preferences by role
-                'voice_preferences': {
-                    'instructor': {'gender': 'female', 'primary_voice': 'Marlene'},
-                    'service_provider': {'gender': 'mixed', 'distribution': 'balanced'},
-                    'customer': {'gender': 'mixed', 'distribution': 'balanced'},
-                    'announcer': {'gender': 'female', 'primary_voice': 'Vicki'}
-                },
-                
-                # Engine preferences
-                'engine_hierarchy': ['generative', 'neural', 'standard'],
-                'fallback_strategy': 'cascade',
-                
-                # Audio processing
-                'sample_rate': '22050',
-                'format': 'mp3',
-                'normalize_volume': True
-            },
-            
-            'visual': {
-                # Template settings
-                'base_template': 'teil1_base.html',
-                'default_theme': 'energetic',
-                'available_themes': ['energetic', 'professional', 'minimalist', 'german'],
-                
-                # Display settings
-                'show_question_numbers': True,
-                'show_progress_bar': True,
-                'show_timer': False,           # No timer for non-exam mode
-                'transition_animations': True,
-                
-                # Layout
-                'content_display_mode': 'combined',  # Text + question together
-                'answer_reveal_mode': 'immediate',   # Show answer right after thinking time
-                
-                # Visual elements
-                'background_style': 'gradient',
-                'font_size': 'medium',
-                'contrast_mode': 'normal'
-            },
-            
-            'structure': {
-                # Content organization
-                'sections': [
-                    {'type': 'intro', 'required': True},
-                    {'type': 'instructions', 'required': True},
-                    {'type': 'combined_tasks', 'count': 5, 'required': True},
-                    {'type': 'outro', 'required': True}
-                ],
-                
-                # Task structure
-                'task_pattern': [
-                    'transition',
-                    'combined_task',  # Text (2x) + Question + Thinking
-                    'answer_reveal'
-                ],
-                
-                # Content requirements
-                'text_length_range': [30, 40],     # Words
-                'question_options': 3,             # a, b, c
-                'required_contexts': [             # Ensure variety
-                    'service_announcement',
-                    'business_message', 
-                    'public_announcement',
-                    'personal_message',
-                    'weather_news'
-                ]
-            },
-            
-            'educational': {
-                # Learning objectives
-                'skill_focus': 'basic_comprehension',
-                'cefr_level': 'A2',
-                'vocabulary_complexity': 'everyday',
-                
-                # Assessment
-                'passing_score': 0.6,              # 60% for A2
-                'feedback_mode': 'immediate',       # Show answers immediately
-                'mistake_analysis': False,          # Keep simple for A2
-                
-                # Adaptation
-                'difficulty_adaptive': False,      # Fixed A2 level
-                'speed_options': ['normal'],       # No speed variation for now
-                'repeat_options': True             # Allow replay
-            }
-        },
-        
-        2: {
-            'name': 'Teil 2 - Long Conversation + Visual Questions',
-            'description': 'One long conversation followed by visual multiple choice',
-            
-            'timing': {
-                'thinking_time': 20.0,          # Longer for complex content
-                'conversation_play_count': 1,   # Play once only
-                'visual_question_time': 25.0,   # Time to examine images
-                'transition_duration': 3.0,
-                'answer_reveal_pause': 3.0
-            },
-            
-            'audio': {
-                'conversation_play_count': 1,
-                'question_play_count': 1,
-                'dialogue_pause_between_speakers': 0.4,
-                'natural_conversation_flow': True,
-                
-                'voice_preferences': {
-                    'dialogue_speakers': {'gender': 'mixed', 'distinct_voices': True},
-                    'instructor': {'gender': 'female', 'primary_voice': 'Marlene'}
-                }
-            },
-            
-            'visual': {
-                'base_template': 'teil2_visual.html',
-                'default_theme': 'professional',  # Better for visual questions
-                'image_display_mode': 'large',
-                'question_layout': 'visual_grid',
-                'show_conversation_transcript': False  # Audio only
-            },
-            
-            'structure': {
-                'sections': [
-                    {'type': 'intro', 'required': True},
-                    {'type': 'instructions', 'required': True},
-                    {'type': 'conversation', 'length': '2-3 minutes', 'required': True},
-                    {'type': 'visual_questions', 'count': 5, 'required': True},
-                    {'type': 'outro', 'required': True}
-                ],
-                
-                'conversation_structure': {
-                    'min_exchanges': 15,
-                    'max_duration': 180,  # 3 minutes max
-                    'speaker_count': 2,
-                    'context_types': ['apartment_search', 'service_inquiry', 'planning_meeting']
-                }
-            }
-        },
-        
-        3: {
-            'name': 'Teil 3 - Short Dialogues + Visual Questions',
-            'description': 'Five short conversations with visual answers',
-            
-            'timing': {
-                'thinking_time': 15.0,           # Medium length
-                'dialogue_play_count': 2,        # Play twice like Teil 1
-                'pause_between_plays': 3.0,
-                'visual_question_time': 20.0,
-                'transition_duration': 2.5
-            },
-            
-            'audio': {
-                'dialogue_play_count': 2,
-                'short_conversation_length': [30, 45],  # Seconds
-                'speaker_variety': True,          # Different speakers per dialogue
-                
-                'voice_preferences': {
-                    'dialogue_speakers': {'gender': 'mixed', 'rotation': 'balanced'},
-                    'service_contexts': ['shop', 'restaurant', 'office', 'public_space']
-                }
-            },
-            
-            'visual': {
-                'base_template': 'teil3_visual.html',
-                'default_theme': 'minimalist',    # Clean for multiple dialogues
-                'image_display_mode': 'medium',
-                'dialogue_counter': True,
-                'context_indicators': True        # Show where conversation happens
-            },
-            
-            'structure': {
-                'sections': [
-                    {'type': 'intro', 'required': True},
-                    {'type': 'instructions', 'required': True},
-                    {'type': 'short_dialogues', 'count': 5, 'required': True},
-                    {'type': 'outro', 'required': True}
-                ],
-                
-                'dialogue_pattern': [
-                    'dialogue_intro',
-                    'short_dialogue',  # 2x play
-                    'visual_question',
-                    'answer_reveal'
-                ]
-            }
-        },
-        
-        4: {
-            'name': 'Teil 4 - Interview + Text Questions',
-            'description': 'Long interview with traditional text-based questions',
-            
-            'timing': {
-                'thinking_time': 30.0,           # Longest for complex analysis
-                'interview_play_count': 1,       # Single play only
-                'question_spacing': 15.0,        # Time between questions
-                'analysis_time': 45.0,           # Time to process interview
-                'transition_duration': 3.0
-            },
-            
-            'audio': {
-                'interview_play_count': 1,
-                'interview_length': [240, 300],  # 4-5 minutes
-                'question_play_count': 1,
-                'complex_vocabulary': True,
-                
-                'voice_preferences': {
-                    'interviewer': {'gender': 'female', 'professional_tone': True},
-                    'interviewee': {'gender': 'mixed', 'natural_speech': True},
-                    'instructor': {'gender': 'female', 'clear_diction': True}
-                }
-            },
-            
-            'visual': {
-                'base_template': 'teil4_interview.html',
-                'default_theme': 'professional',  # Serious tone for interviews
-                'show_interview_progress': True,
-                'question_display_mode': 'text_focus',
-                'background_complexity': 'minimal'  # Keep focus on content
-            },
-            
-            'structure': {
-                'sections': [
-                    {'type': 'intro', 'required': True},
-                    {'type': 'instructions', 'required': True},
-                    {'type': 'interview', 'length': '4-5 minutes', 'required': True},
-                    {'type': 'processing_time', 'duration': 45, 'required': True},
-                    {'type': 'text_questions', 'count': 8, 'required': True},
-                    {'type': 'outro', 'required': True}
-                ],
-                
-                'interview_structure': {
-                    'topic_complexity': 'personal_experience',
-                    'vocabulary_level': 'B1_bridge',  # Slightly harder
-                    'speech_rate': 'natural',
-                    'accent_variety': 'standard_german'
-                }
-            }
-        }
-    }
+    yaml, _, YamlDumper = _yaml()
     
     # Create YAML files for each Teil
-    for teil_num, config in configs.items():
+    for teil_num, config in DEFAULTS.items():
         config_file = config_dir / f'teil{teil_num}.yaml'
         
-        with open(config_file, 'w', encoding='utf-8') as f:
-            yaml.dump(config, f, default_flow_style=False, allow_unicode=True, sort_keys=False)
+        # Dump to one string and write it in a single call
+        data = yaml.dump(config, Dumper=YamlDumper, default_flow_style=False, allow_unicode=True, sort_keys=False)
+        config_file.write_bytes(data.encode('utf-8'))
         
         print(f"Created config/teil/teil{teil_num}.yaml")
     
     # Create a master index file
     index_file = config_dir / 'index.yaml'
     index_data = {
-        'available_teile': list(configs.keys()),
+        'available_teile': list(DEFAULTS.keys()),
         'config_version': '1.0',
         'last_updated': '2024-12-19',
         'description': 'Goethe A2 Teil configuration system'
     }
     
-    with open(index_file, 'w', encoding='utf-8') as f:
-        yaml.dump(index_data, f, default_flow_style=False)
+    index_file.write_bytes(yaml.dump(index_data, Dumper=YamlDumper, default_flow_style=False).encode('utf-8'))
     
     print(f"Created config/teil/index.yaml")
     print("Configuration system ready!")
 
 # Integration helper
-def get_timing_for_audio_generator(teil: int) -> Dict[str, float]:
+@functools.lru_cache(maxsize=1)
+def get_config_manager() -> TeilConfigManager:
+    """Process-wide manager, so the helpers below parse config/teil/*.yaml once"""
+    return TeilConfigManager()
+
+def get_timing_for_audio_generator(teil: int) -> Mapping[str, float]:
     """Get timing configuration formatted for audio generator"""
-    manager = TeilConfigManager()
-    timing = manager.get_timing_config(teil)
-    
-    return {
-        'thinking_time': timing.get('thinking_time', 5.0),
-        'pause_between_plays': timing.get('pause_between_plays', 3.0),
-        'transition_duration': timing.get('transition_duration', 2.5),
-        'answer_reveal_pause': timing.get('answer_reveal_pause', 2.0),
-        'task_setup_pause': timing.get('task_setup_pause', 0.5)
-    }
+    return get_config_manager().get_timing_view(teil)
 
-def get_audio_settings_for_generator(teil: int) -> Dict[str, Any]:
+def get_audio_settings_for_generator(teil: int) -> Mapping[str, Any]:
     """Get audio configuration formatted for audio generator"""
-    manager = TeilConfigManager()
-    audio = manager.get_audio_config(teil)
-    
-    return {
-        'text_play_count': audio.get('text_play_count', 2),
-        'question_play_count': audio.get('question_play_count', 1),
-        'engine_hierarchy': audio.get('engine_hierarchy', ['generative', 'neural', 'standard']),
-        'voice_preferences': audio.get('voice_preferences', {}),
-        'sample_rate': audio.get('sample_rate', '22050'),
-        'format': audio.get('format', 'mp3')
-    }
+    return get_config_manager().get_audio_view(teil)
 
-def get_template_settings_for_generator(teil: int, theme: str = None) -> Dict[str, Any]:
+def get_template_settings_for_generator(teil: int, theme: str = None) -> Mapping[str, Any]:
     """Get visual configuration for video generator"""
-    manager = TeilConfigManager()
-    visual = manager.get_visual_config(teil)
-    
-    return {
-        'base_template': visual.get('base_template', f'teil{teil}_base.html'),
-        'theme': theme or visual.get('default_theme', 'energetic'),
-        'available_themes': visual.get('available_themes', ['energetic']),
-        'show_progress_bar': visual.get('show_progress_bar', True),
-        'transition_animations': visual.get('transition_animations', True),
-        'content_display_mode': visual.get('content_display_mode', 'combined')
-    }
+    settings = get_config_manager().get_visual_view(teil)
+    if theme:
+        return {**settings, 'theme': theme}
+    return settings
 
 if __name__ == "__main__":
     # Create all configuration files
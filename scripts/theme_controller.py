@@ -4,48 +4,75 @@ Theme Controller for Synchronized Video Generation
 Provides easy theme switching and customization.
 """
 
-import json
+import functools
+import io
+import re
 from pathlib import Path
-from typing import Dict, Any
+from types import MappingProxyType
+from typing import Any, Mapping
+
+# Every substitution apply_theme_to_template makes; the group keeps matches in split()
+_PLACEHOLDER_RE = re.compile(r'(\{\{(?:theme_styles|theme_link)\}\}|class="sync-container theme-container")')
+
+@functools.lru_cache(maxsize=64)
+def _read_text_cached(path_str: str, mtime_ns: int) -> str:
+    """Read a template or CSS file; the mtime in the key invalidates edited files"""
+    return Path(path_str).read_text(encoding='utf-8')
+
+def _read_text(path) -> str:
+    """Read a text file through the (path, mtime) cache"""
+    path = Path(path)
+    return _read_text_cached(str(path), path.stat().st_mtime_ns)
+
+@functools.lru_cache(maxsize=64)
+def _compile_template(path_str: str, mtime_ns: int) -> tuple:
+    """
+    Split a base template into literal text (even indices) and placeholders
+    (odd indices) once per file version, so each theme is rendered with a join.
+    """
+    return tuple(_PLACEHOLDER_RE.split(_read_text_cached(path_str, mtime_ns)))
+
+# Built-in themes, shared read-only by every ThemeController
+_THEMES = MappingProxyType({name: MappingProxyType(info) for name, info in {
+    'energetic': {
+        'name': 'Your Brand (Energetic)',
+        'description': 'Gold/pink vibrant design with your current branding',
+        'css_class': 'theme-energetic',
+        'target_audience': 'General learners, engaging content',
+        'file': 'themes/energetic.css'
+    },
+    'professional': {
+        'name': 'Professional Academic',
+        'description': 'Clean institutional design for business learners', 
+        'css_class': 'theme-professional',
+        'target_audience': 'Business professionals, corporate training',
+        'file': 'themes/professional.css'
+    },
+    'minimalist': {
+        'name': 'Minimalist Clean',
+        'description': 'Simple, distraction-free design',
+        'css_class': 'theme-minimalist', 
+        'target_audience': 'Focus-oriented learners, accessibility',
+        'file': 'themes/minimalist.css'
+    },
+    'german': {
+        'name': 'German Cultural',
+        'description': 'German flag colors and cultural elements',
+        'css_class': 'theme-german',
+        'target_audience': 'Cultural immersion, patriotic learners',
+        'file': 'themes/german.css'
+    }
+}.items()})
 
 class ThemeController:
     def __init__(self):
-        self.themes = {
-            'energetic': {
-                'name': 'Your Brand (Energetic)',
-                'description': 'Gold/pink vibrant design with your current branding',
-                'css_class': 'theme-energetic',
-                'target_audience': 'General learners, engaging content',
-                'file': 'themes/energetic.css'
-            },
-            'professional': {
-                'name': 'Professional Academic',
-                'description': 'Clean institutional design for business learners', 
-                'css_class': 'theme-professional',
-                'target_audience': 'Business professionals, corporate training',
-                'file': 'themes/professional.css'
-            },
-            'minimalist': {
-                'name': 'Minimalist Clean',
-                'description': 'Simple, distraction-free design',
-                'css_class': 'theme-minimalist', 
-                'target_audience': 'Focus-oriented learners, accessibility',
-                'file': 'themes/minimalist.css'
-            },
-            'german': {
-                'name': 'German Cultural',
-                'description': 'German flag colors and cultural elements',
-                'css_class': 'theme-german',
-                'target_audience': 'Cultural immersion, patriotic learners',
-                'file': 'themes/german.css'
-            }
-        }
+        self.themes = _THEMES
     
-    def get_theme_info(self, theme_name: str) -> Dict[str, Any]:
+    def get_theme_info(self, theme_name: str) -> Mapping[str, Any]:
         """Get information about a specific theme"""
         return self.themes.get(theme_name, {})
     
-    def list_themes(self) -> Dict[str, Dict[str, Any]]:
+    def list_themes(self) -> Mapping[str, Mapping[str, Any]]:
         """List all available themes"""
         return self.themes
     
@@ -58,38 +85,47 @@ class ThemeController:
         
         theme_info = self.themes[theme_name]
         
-        # Read base template
-        with open(base_template_path, 'r', encoding='utf-8') as f:
-            template_content = f.read()
+        # Read and split the base template
+        base_template_path = Path(base_template_path)
+        template_parts = _compile_template(str(base_template_path), base_template_path.stat().st_mtime_ns)
         
         # Load theme CSS
         theme_css_path = Path(theme_info['file'])
-        if theme_css_path.exists():
-            with open(theme_css_path, 'r', encoding='utf-8') as f:
-                theme_css = f.read()
-        else:
+        try:
+            theme_css = _read_text(theme_css_path)
+        except FileNotFoundError:
             print(f"⚠️ Theme CSS file not found: {theme_css_path}")
             theme_css = f"/* Theme CSS for {theme_name} not found */"
         
-        # Apply theme
-        themed_template = template_content.replace('{{theme_styles}}', theme_css)
-        themed_template = themed_template.replace('{{theme_link}}', '')
-        
-        # Add theme class to container
-        themed_template = themed_template.replace(
-            'class="sync-container theme-container"',
-            f'class="sync-container theme-container {theme_info["css_class"]}"'
-        )
+        # Apply theme and add the theme class to the container
+        replacements = {
+            '{{theme_styles}}': theme_css,
+            '{{theme_link}}': '',
+            'class="sync-container theme-container"':
+                f'class="sync-container theme-container {theme_info["css_class"]}"'
+        }
+        themed_template = ''.join(replacements[part] if i % 2 else part
+                                  for i, part in enumerate(template_parts))
         
         # Save themed template if output path provided
         if output_path:
             output_path = Path(output_path)
             output_path.parent.mkdir(parents=True, exist_ok=True)
             
-            with open(output_path, 'w', encoding='utf-8') as f:
-                f.write(themed_template)
+            data = themed_template.encode('utf-8')
+            
+            # Leave an identical file untouched so its mtime doesn't trigger watchers
+            try:
+                unchanged = (output_path.stat().st_size == len(data)
+                             and output_path.read_bytes() == data)
+            except FileNotFoundError:
+                unchanged = False
             
-            print(f"✅ Themed template saved: {output_path}")
+            if unchanged:
+                print(f"✅ Themed template up to date: {output_path}")
+            else:
+                output_path.write_bytes(data)
+                print(f"✅ Themed template saved: {output_path}")
         
         return themed_template
     
@@ -100,9 +136,7 @@ class ThemeController:
         output_dir = Path(output_dir)
         output_dir.mkdir(parents=True, exist_ok=True)
         
-        generated_files = []
-        
-        for theme_name, theme_info in self.themes.items():
+        def generate(theme_name):
             output_file = output_dir / f"teil1_{theme_name}.html"
             
             try:
@@ -111,42 +145,45 @@ class ThemeController:
                     theme_name=theme_name,
                     output_path=output_file
                 )
-                generated_files.append(output_file)
-                print(f"✅ Generated: {output_file}")
+                return output_file
                 
             except Exception as e:
                 print(f"❌ Failed to generate {theme_name}: {e}")
+                return None
+        
+        # Each theme is independent file IO, so they are written concurrently
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=len(self.themes)) as executor:
+            results = list(executor.map(generate, self.themes))
         
-        return generated_files
+        return [output_file for output_file in results if output_file is not None]
     
     def create_theme_report(self, output_file: str = 'theme_report.md'):
         """Create a markdown report of all available themes"""
-        report_lines = [
-            "# Available Video Themes",
-            "",
-            "This document describes all available themes for the Goethe video generation system.",
-            ""
-        ]
+        report = io.StringIO()
+        report.write(
+            "# Available Video Themes\n"
+            "\n"
+            "This document describes all available themes for the Goethe video generation system.\n"
+        )
         
         for theme_name, theme_info in self.themes.items():
-            report_lines.extend([
-                f"## {theme_info['name']} (`{theme_name}`)",
-                "",
-                f"**Description:** {theme_info['description']}",
-                f"**Target Audience:** {theme_info['target_audience']}",
-                f"**CSS Class:** `{theme_info['css_class']}`",
-                f"**CSS File:** `{theme_info['file']}`",
-                "",
-                "### Usage",
-                f"```bash",
-                f"# Generate with {theme_name} theme",
-                f"python scripts/synchronized_pipeline.py input.json --theme {theme_name}",
-                f"```",
-                ""
-            ])
+            report.write(
+                f"\n## {theme_info['name']} (`{theme_name}`)\n"
+                "\n"
+                f"**Description:** {theme_info['description']}\n"
+                f"**Target Audience:** {theme_info['target_audience']}\n"
+                f"**CSS Class:** `{theme_info['css_class']}`\n"
+                f"**CSS File:** `{theme_info['file']}`\n"
+                "\n"
+                "### Usage\n"
+                "```bash\n"
+                f"# Generate with {theme_name} theme\n"
+                f"python scripts/synchronized_pipeline.py input.json --theme {theme_name}\n"
+                "```\n"
+            )
         
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write('\n'.join(report_lines))
+        Path(output_file).write_text(report.getvalue(), encoding='utf-8')
         
         print(f"📄 Theme report created: {output_file}")
         return output_file
@@ -194,42 +231,42 @@ def main():
     import argparse
     
     parser = argparse.ArgumentParser(description='Theme Controller for Goethe Videos')
-    parser.add_argument('--setup', action='store_true', help='Set up theme system')
-    parser.add_argument('--list-themes', action='store_true', help='List available themes')
-    parser.add_argument('--generate-all', help='Generate all themed templates from base template')
-    parser.add_argument('--apply-theme', nargs=3, metavar=('BASE', 'THEME', 'OUTPUT'), 
-                       help='Apply theme: base_template theme_name output_file')
-    parser.add_argument('--create-report', action='store_true', help='Create theme report')
+    subparsers = parser.add_subparsers(dest='command')
+    subparsers.add_parser('setup', help='Set up theme system')
+    subparsers.add_parser('list', help='List available themes')
+    generate_parser = subparsers.add_parser('generate-all', help='Generate all themed templates from base template')
+    generate_parser.add_argument('base_template')
+    apply_parser = subparsers.add_parser('apply-theme', help='Apply theme: base_template theme_name output_file')
+    apply_parser.add_argument('base_template')
+    apply_parser.add_argument('theme_name')
+    apply_parser.add_argument('output_file')
+    subparsers.add_parser('report', help='Create theme report')
     
     args = parser.parse_args()
     
-    if args.setup:
-        controller = setup_theme_system()
-        return
-    
-    controller = ThemeController()
+    if args.command == 'setup':
+        setup_theme_system()
     
-    if args.list_themes:
+    elif args.command == 'list':
         print("🎨 Available Themes:")
         print("=" * 50)
-        for theme_name, theme_info in controller.list_themes().items():
+        for theme_name, theme_info in _THEMES.items():
             print(f"📌 {theme_info['name']} ({theme_name})")
             print(f"   {theme_info['description']}")
             print(f"   Target: {theme_info['target_audience']}")
             print()
     
-    elif args.generate_all:
+    elif args.command == 'generate-all':
         print("🎨 Generating all themed templates...")
-        generated = controller.generate_all_themed_templates(args.generate_all)
+        generated = ThemeController().generate_all_themed_templates(args.base_template)
         print(f"✅ Generated {len(generated)} themed templates")
     
-    elif args.apply_theme:
-        base_template, theme_name, output_file = args.apply_theme
-        print(f"🎨 Applying theme '{theme_name}' to {base_template}")
-        controller.apply_theme_to_template(base_template, theme_name, output_file)
+    elif args.command == 'apply-theme':
+        print(f"🎨 Applying theme '{args.theme_name}' to {args.base_template}")
+        ThemeController().apply_theme_to_template(args.base_template, args.theme_name, args.output_file)
     
-    elif args.create_report:
-        report_file = controller.create_theme_report()
+    elif args.command == 'report':
+        report_file = ThemeController().create_theme_report()
         print(f"📄 Theme report created: {report_file}")
     
     else:
@@ -4,10 +4,24 @@ Audio testing configuration and utilities.
 Provides test data and helper functions for audio testing.
 """
 
+import copy
 import json
+import os
+import shutil
 import tempfile
 from pathlib import Path
 
+try:
+    import orjson  # Optional: faster fixture serialization
+except ImportError:
+    orjson = None
+
+def _dumps(data):
+    """Serialize fixture data to indented UTF-8 JSON bytes"""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    return json.dumps(data, ensure_ascii=False, indent=2).encode('utf-8')
+
 # Test production JSON data for audio testing
 TEST_PRODUCTION_JSON = {
     "exam_info": {
@@ -170,31 +184,32 @@ MINIMAL_TEST_DATA = {
     ]
 }
 
-def create_test_production_file(data=None, suffix="_test_audio"):
+# Throwaway fixtures go to RAM-backed /dev/shm where available (None = platform temp dir)
+_TMPDIR = '/dev/shm' if os.path.isdir('/dev/shm') and os.access('/dev/shm', os.W_OK) else None
+
+def create_test_production_file(data=None, suffix="_test_audio", dir=None):
     """
     Create a temporary production JSON file for testing
     
     Args:
         data: JSON data to write (defaults to TEST_PRODUCTION_JSON)
         suffix: Filename suffix
+        dir: Directory for the file (defaults to /dev/shm or the platform temp dir)
     
     Returns:
         Path to temporary file
     """
     if data is None:
         data = TEST_PRODUCTION_JSON
+    payload = _dumps(data)
     
-    temp_file = tempfile.NamedTemporaryFile(
-        mode='w', 
-        suffix=f'{suffix}.json', 
-        delete=False,
-        encoding='utf-8'
-    )
-    
-    json.dump(data, temp_file, ensure_ascii=False, indent=2)
-    temp_file.close()
+    fd, temp_name = tempfile.mkstemp(suffix=f'{suffix}.json', dir=dir or _TMPDIR)
+    try:
+        os.write(fd, payload)
+    finally:
+        os.close(fd)
     
-    return Path(temp_file.name)
+    return Path(temp_name)
 
 def create_minimal_test_file():
     """Create a minimal test file for quick testing"""
@@ -212,17 +227,25 @@ class AudioTestHelper:
     
     def __init__(self):
         self.temp_files = []
+        self._dir = None  # Private fixture directory, created on first use
+    
+    def create_test_payload(self, data=None):
+        """Return fixture data for code that accepts a parsed dict; nothing touches disk"""
+        return copy.deepcopy(TEST_PRODUCTION_JSON if data is None else data)
     
     def create_test_file(self, data=None, suffix="_test"):
         """Create a test file and track it for cleanup"""
-        file_path = create_test_production_file(data, suffix)
+        if self._dir is None:
+            self._dir = tempfile.mkdtemp(prefix='audio_test_', dir=_TMPDIR)
+        file_path = create_test_production_file(data, suffix, dir=self._dir)
         self.temp_files.append(file_path)
         return file_path
     
     def cleanup_all(self):
-        """Clean up all created test files"""
-        for file_path in self.temp_files:
-            cleanup_test_file(file_path)
+        """Clean up all created test files by removing their directory"""
+        if self._dir is not None:
+            shutil.rmtree(self._dir, ignore_errors=True)
+            self._dir = None
         self.temp_files.clear()
     
     def __enter__(self):
@@ -280,17 +303,19 @@ def print_test_summary(test_name, passed, failed, skipped=0):
     """Print a formatted test summary"""
     total = passed + failed + skipped
     
-    print(f"\n📊 {test_name} Test Summary:")
-    print(f"   ✅ Passed: {passed}/{total}")
+    lines = [f"\n📊 {test_name} Test Summary:", f"   ✅ Passed: {passed}/{total}"]
     if failed > 0:
-        print(f"   ❌ Failed: {failed}/{total}")
+        lines.append(f"   ❌ Failed: {failed}/{total}")
     if skipped > 0:
-        print(f"   ⏭️  Skipped: {skipped}/{total}")
+        lines.append(f"   ⏭️  Skipped: {skipped}/{total}")
     
     if failed == 0:
-        print(f"   🎉 All {test_name.lower()} tests successful!")
+        lines.append(f"   🎉 All {test_name.lower()} tests successful!")
     else:
-        print(f"   ⚠️  {failed} {test_name.lower()} tests need attention")
+        lines.append(f"   ⚠️  {failed} {test_name.lower()} tests need attention")
+    
+    # One write for the whole summary
+    print("\n".join(lines))
 
 if __name__ == "__main__":
     print("🧪 Audio Test Configuration")
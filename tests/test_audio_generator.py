@@ -4,73 +4,83 @@ Comprehensive test suite for audio generation.
 Tests both functionality and integration with Amazon Polly.
 """
 
+import copy
+import functools
+import io
 import unittest
 import tempfile
-import json
 import os
 import sys
 from pathlib import Path
-from unittest.mock import Mock, patch, MagicMock
-import boto3
-from botocore.exceptions import NoCredentialsError, ClientError
+from unittest.mock import MagicMock, patch
 
 # Add scripts directory to path
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+_SCRIPTS = os.path.normpath(os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+if _SCRIPTS not in sys.path:
+    sys.path.insert(0, _SCRIPTS)
 
 # Import the audio generator
 from generate_audio_old import AudioGenerator
 
+def setUpModule():
+    """Keep every AudioGenerator off real Polly unless the AWS tests are enabled"""
+    if os.getenv('TEST_WITH_AWS') != 'true':
+        boto3_patcher = patch('boto3.client', return_value=MagicMock())
+        boto3_patcher.start()
+        unittest.addModuleCleanup(boto3_patcher.stop)
+
+# Create a minimal MP3 file (this is a hack for testing): fake MP3 header + data
+_FAKE_MP3 = b'\xff\xfb\x90\x00' + b'\x00' * 1000
+
+class _FakeAudioStream:
+    """Stands in for Polly's streaming body"""
+    def __init__(self, data):
+        self._data = data
+    
+    def read(self):
+        return self._data
+
+class _FakePolly:
+    """Polly client stub that replays responses in order and records each call"""
+    def __init__(self, *results):
+        self._results = list(results)
+        self.calls = []
+    
+    def synthesize_speech(self, **kwargs):
+        self.calls.append(kwargs)
+        result = self._results.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return {'AudioStream': _FakeAudioStream(result)}
+
+class _FakeSegment:
+    """AudioSegment stub; len() is the duration in milliseconds"""
+    def __init__(self, duration_ms):
+        self._duration_ms = duration_ms
+    
+    def __len__(self):
+        return self._duration_ms
+
 class TestAudioGeneratorUnit(unittest.TestCase):
     """Unit tests for AudioGenerator class methods"""
     
+    @classmethod
+    def setUpClass(cls):
+        """Build one generator for the class"""
+        # The shared generator never needs a real Polly client
+        boto3_patcher = patch('boto3.client')
+        boto3_patcher.start()
+        cls.addClassCleanup(boto3_patcher.stop)
+        cls._shared_gen = AudioGenerator()
+    
     def setUp(self):
         """Set up test fixtures"""
-        self.audio_gen = AudioGenerator()
-        
-        # Sample production JSON data
-        self.sample_production_data = {
-            "exam_info": {
-                "title": "Goethe A2 Hörverstehen - Teil 1 - Übung 1",
-                "level": "A2",
-                "teil": 1,
-                "ubung": 1
-            },
-            "instructions": {
-                "main": "Sie hören fünf kurze Texte.",
-                "task": "Wählen Sie bei jeder Aufgabe die richtige Lösung a, b oder c.",
-                "repetition": "Sie hören jeden Text zweimal."
-            },
-            "content": [
-                {
-                    "number": 1,
-                    "text": "Hallo! Das ist ein Test.",
-                    "speaker": "TestSpeaker",
-                    "speakers": {
-                        "TestSpeaker": {
-                            "voice_name": "Marlene",
-                            "engine": "neural",
-                            "fallback_engines": ["standard"],
-                            "language": "de-DE",
-                            "gender": "female",
-                            "speaking_rate": "medium",
-                            "role": "service_provider"
-                        }
-                    }
-                }
-            ],
-            "questions": [
-                {
-                    "number": 1,
-                    "question": "Was ist das?",
-                    "options": {
-                        "a": "Ein Test",
-                        "b": "Ein Spiel", 
-                        "c": "Ein Buch"
-                    },
-                    "correct_answer": "a"
-                }
-            ]
-        }
+        self.audio_gen = self._shared_gen
+        self._saved_polly_client = self.audio_gen.polly_client
+    
+    def tearDown(self):
+        """Undo any client swap so the next test sees the shared generator unchanged"""
+        self.audio_gen.polly_client = self._saved_polly_client
     
     def test_audio_generator_initialization(self):
         """Test AudioGenerator initializes correctly"""
@@ -83,60 +93,46 @@ class TestAudioGeneratorUnit(unittest.TestCase):
         silence = self.audio_gen.create_silence(2.0)
         self.assertEqual(len(silence), 2000)  # 2 seconds = 2000ms
     
-    @patch('boto3.client')
-    def test_generate_speech_success(self, mock_boto_client):
+    def test_generate_speech_success(self):
         """Test successful speech generation"""
-        # Mock Polly response
-        mock_response = {
-            'AudioStream': Mock()
-        }
-        mock_response['AudioStream'].read.return_value = b'fake_audio_data'
-        
-        mock_polly = Mock()
-        mock_polly.synthesize_speech.return_value = mock_response
-        mock_boto_client.return_value = mock_polly
-        
-        # Create new generator with mocked client
-        audio_gen = AudioGenerator()
-        audio_gen.polly_client = mock_polly
+        mock_polly = _FakePolly(b'fake_audio_data')
+        self.audio_gen.polly_client = mock_polly
         
         # Test speech generation
-        result = audio_gen.generate_speech("Test text", "Marlene", "neural")
+        result = self.audio_gen.generate_speech("Test text", "Marlene", "neural")
         
         self.assertEqual(result, b'fake_audio_data')
-        mock_polly.synthesize_speech.assert_called_once_with(
+        self.assertEqual(mock_polly.calls, [dict(
             Text="Test text",
             OutputFormat='mp3',
             VoiceId="Marlene",
             Engine="neural",
             SampleRate='22050'
-        )
+        )])
     
-    @patch('boto3.client')
-    def test_generate_speech_fallback(self, mock_boto_client):
-        """Test fallback to standard engine when neural fails"""
-        mock_polly = Mock()
-        
-        # Create mock for successful response
-        mock_success_response = {'AudioStream': Mock()}
-        mock_success_response['AudioStream'].read.return_value = b'fallback_audio'
+    def test_generate_speech_fallback(self):
+        """Test fallback to standard engine when the requested engine fails"""
+        from botocore.exceptions import ClientError
         
-        # First call (neural) fails, second call (standard) succeeds
-        mock_polly.synthesize_speech.side_effect = [
-            ClientError({'Error': {'Code': 'InvalidParameterValue'}}, 'synthesize_speech'),
-            mock_success_response
+        # Requested engine -> engines Polly should see, in order
+        fallback_chains = [
+            ('neural', ['neural', 'standard']),
+            ('generative', ['generative', 'standard']),
         ]
         
-        mock_boto_client.return_value = mock_polly
-        
-        audio_gen = AudioGenerator()
-        audio_gen.polly_client = mock_polly
-        
-        result = audio_gen.generate_speech("Test", "Marlene", "neural")
-        
-        # Should have been called twice (neural, then standard)
-        self.assertEqual(mock_polly.synthesize_speech.call_count, 2)
-        self.assertEqual(result, b'fallback_audio')
+        for engine, expected_engines in fallback_chains:
+            with self.subTest(engine=engine):
+                # First call fails, the standard-engine retry succeeds
+                mock_polly = _FakePolly(
+                    ClientError({'Error': {'Code': 'InvalidParameterValue'}}, 'synthesize_speech'),
+                    b'fallback_audio'
+                )
+                self.audio_gen.polly_client = mock_polly
+                
+                result = self.audio_gen.generate_speech("Test", "Marlene", engine)
+                
+                self.assertEqual([call['Engine'] for call in mock_polly.calls], expected_engines)
+                self.assertEqual(result, b'fallback_audio')
 
     
     def test_save_audio(self):
@@ -154,17 +150,19 @@ class TestAudioGeneratorUnit(unittest.TestCase):
 class TestAudioGeneratorIntegration(unittest.TestCase):
     """Integration tests with real AWS Polly (optional)"""
     
-    def setUp(self):
-        """Set up for integration tests"""
-        self.audio_gen = AudioGenerator()
+    @classmethod
+    def setUpClass(cls):
+        """Set up one real generator for the integration tests"""
+        cls.audio_gen = AudioGenerator()
         
         # Check if AWS credentials are available
         try:
+            import boto3
             session = boto3.Session()
             credentials = session.get_credentials()
-            self.aws_available = credentials is not None
+            cls.aws_available = credentials is not None
         except:
-            self.aws_available = False
+            cls.aws_available = False
     
     @unittest.skipUnless(os.getenv('TEST_WITH_AWS') == 'true', "Set TEST_WITH_AWS=true to run AWS tests")
     def test_real_polly_connection(self):
@@ -187,6 +185,7 @@ class TestAudioGeneratorIntegration(unittest.TestCase):
             self.skipTest("AWS credentials not available")
         
         try:
+            import boto3
             polly = boto3.client('polly', region_name='us-east-1')
             voices = polly.describe_voices(LanguageCode='de-DE')
             
@@ -203,9 +202,10 @@ class TestAudioGeneratorIntegration(unittest.TestCase):
 class TestAudioGeneratorEnd2End(unittest.TestCase):
     """End-to-end tests with mocked Polly"""
     
-    def setUp(self):
-        """Set up for end-to-end tests"""
-        self.test_production_data = {
+    @classmethod
+    def setUpClass(cls):
+        """Build the production data once; tests work on deep copies"""
+        cls.test_production_data = {
             "exam_info": {
                 "title": "Test Exercise",
                 "level": "A2",
@@ -261,46 +261,36 @@ class TestAudioGeneratorEnd2End(unittest.TestCase):
     def test_generate_all_audio_structure(self, mock_save, mock_generate, mock_audio_segment):
         """Test complete audio generation process structure"""
         
-        # Mock AudioSegment for duration calculation
-        mock_segment = Mock()
-        mock_segment.__len__ = Mock(return_value=5000)  # 5 seconds
-        mock_audio_segment.from_mp3.return_value = mock_segment
+        # Stub AudioSegment for duration calculation
+        mock_audio_segment.from_mp3.return_value = _FakeSegment(5000)  # 5 seconds
         
         # Mock speech generation
         mock_generate.return_value = b'fake_audio_data'
         
-        # Create temporary production file
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as temp_file:
-            json.dump(self.test_production_data, temp_file)
-            temp_file_path = temp_file.name
+        # The generator takes the parsed production data directly, no file needed
+        audio_gen = AudioGenerator()
+        audio_dir, sequence_info = audio_gen.generate_all_audio(copy.deepcopy(self.test_production_data), 'test_production')
         
-        try:
-            audio_gen = AudioGenerator()
-            audio_dir, sequence_info = audio_gen.generate_all_audio(temp_file_path)
-            
-            # Verify structure
-            self.assertIsInstance(audio_dir, Path)
-            self.assertIsInstance(sequence_info, dict)
-            
-            # Check sequence info structure
-            self.assertIn('total_duration', sequence_info)
-            self.assertIn('audio_files', sequence_info)
-            self.assertIn('sequence', sequence_info)
-            
-            # Check that all expected audio types are generated
-            sequence = sequence_info['sequence']
-            audio_types = [item['type'] for item in sequence]
-            
-            self.assertIn('instructions', audio_types)
-            self.assertIn('text', audio_types)
-            self.assertIn('question', audio_types)
-            
-            # Verify correct number of calls
-            # Should be: 1 instructions + 2 texts + 2 questions = 5 total
-            self.assertEqual(mock_generate.call_count, 5)
-            
-        finally:
-            os.unlink(temp_file_path)
+        # Verify structure
+        self.assertIsInstance(audio_dir, Path)
+        self.assertIsInstance(sequence_info, dict)
+        
+        # Check sequence info structure
+        self.assertIn('total_duration', sequence_info)
+        self.assertIn('audio_files', sequence_info)
+        self.assertIn('sequence', sequence_info)
+        
+        # Check that all expected audio types are generated
+        sequence = sequence_info['sequence']
+        audio_types = [item['type'] for item in sequence]
+        
+        self.assertIn('instructions', audio_types)
+        self.assertIn('text', audio_types)
+        self.assertIn('question', audio_types)
+        
+        # Verify correct number of calls
+        # Should be: 1 instructions + 2 texts + 2 questions = 5 total
+        self.assertEqual(mock_generate.call_count, 5)
 
 class TestAudioValidation(unittest.TestCase):
     """Tests for audio quality and validation"""
@@ -312,17 +302,16 @@ class TestAudioValidation(unittest.TestCase):
         audio_gen = AudioGenerator()
         
         # Test with fake audio data
-        with tempfile.NamedTemporaryFile(suffix='.mp3', delete=False) as temp_audio:
-            # Create a minimal MP3 file (this is a hack for testing)
-            temp_audio.write(b'\xff\xfb\x90\x00' + b'\x00' * 1000)  # Fake MP3 header + data
-            temp_path = temp_audio.name
+        fd, temp_path = tempfile.mkstemp(suffix='.mp3')
+        try:
+            os.write(fd, _FAKE_MP3)
+        finally:
+            os.close(fd)
         
         try:
             # This would normally load with pydub, but we'll mock it
             with patch('generate_audio.AudioSegment') as mock_segment:
-                mock_audio = Mock()
-                mock_audio.__len__ = Mock(return_value=3000)  # 3 seconds
-                mock_segment.from_mp3.return_value = mock_audio
+                mock_segment.from_mp3.return_value = _FakeSegment(3000)  # 3 seconds
                 
                 # Load the mock audio
                 segment = mock_segment.from_mp3(temp_path)
@@ -333,36 +322,73 @@ class TestAudioValidation(unittest.TestCase):
         finally:
             os.unlink(temp_path)
 
-def run_audio_tests(test_level='unit'):
+# Test classes each level runs, in order
+_UNIT_TEST_CLASSES = (TestAudioGeneratorUnit, TestAudioGeneratorEnd2End, TestAudioValidation)
+_INTEGRATION_TEST_CLASSES = (TestAudioGeneratorIntegration,)
+
+@functools.lru_cache(maxsize=None)
+def _test_method_names(test_class):
+    """Collect a class's test method names once per process"""
+    return tuple(unittest.TestLoader().getTestCaseNames(test_class))
+
+def _build_suite(test_classes):
+    """
+    Fresh suite of test instances; a TestSuite drops its tests as it runs them,
+    so only the method names are reused between runs.
+    """
+    return unittest.TestSuite(test_class(name) for test_class in test_classes
+                              for name in _test_method_names(test_class))
+
+def _run_test_class(class_name):
+    """Run one test case class (in a worker process); returns picklable results"""
+    stream = io.StringIO()
+    suite = _build_suite((globals()[class_name],))
+    result = unittest.TextTestRunner(stream=stream, verbosity=2).run(suite)
+    return (stream.getvalue(), result.testsRun, result.wasSuccessful(),
+            [(str(test), traceback) for test, traceback in result.failures],
+            [(str(test), traceback) for test, traceback in result.errors])
+
+def run_audio_tests(test_level='unit', jobs=1):
     """
     Run audio tests at different levels
     
     Args:
         test_level: 'unit', 'integration', 'all'
+        jobs: Worker processes; above 1, each test class runs in its own process
     """
     print(f"🎵 Running Audio Generator Tests - Level: {test_level}")
     print("=" * 60)
     
-    loader = unittest.TestLoader()
-    suite = unittest.TestSuite()
-    
     # Always run unit tests
-    suite.addTests(loader.loadTestsFromTestCase(TestAudioGeneratorUnit))
-    suite.addTests(loader.loadTestsFromTestCase(TestAudioGeneratorEnd2End))
-    suite.addTests(loader.loadTestsFromTestCase(TestAudioValidation))
+    test_classes = _UNIT_TEST_CLASSES
     
     # Add integration tests if requested
     if test_level in ['integration', 'all']:
-        suite.addTests(loader.loadTestsFromTestCase(TestAudioGeneratorIntegration))
+        test_classes += _INTEGRATION_TEST_CLASSES
     
     # Run tests
-    runner = unittest.TextTestRunner(verbosity=2)
-    result = runner.run(suite)
+    if jobs > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            outcomes = list(executor.map(_run_test_class, [cls.__name__ for cls in test_classes]))
+        for output, *_ in outcomes:
+            sys.stderr.write(output)
+        tests_run = sum(outcome[1] for outcome in outcomes)
+        success = all(outcome[2] for outcome in outcomes)
+        failures = [failure for outcome in outcomes for failure in outcome[3]]
+        errors = [error for outcome in outcomes for error in outcome[4]]
+    else:
+        runner = unittest.TextTestRunner(verbosity=2)
+        result = runner.run(_build_suite(test_classes))
+        tests_run = result.testsRun
+        success = result.wasSuccessful()
+        failures = result.failures
+        errors = result.errors
     
     print("\n" + "=" * 60)
-    if result.wasSuccessful():
+    if success:
         print("✅ All audio tests passed!")
-        print(f"📊 Ran {result.testsRun} tests successfully")
+        print(f"📊 Ran {tests_run} tests successfully")
         
         if test_level == 'unit':
             print("\n💡 To test with real AWS:")
@@ -370,22 +396,22 @@ def run_audio_tests(test_level='unit'):
             print("   python tests/test_audio_generator.py integration")
     else:
         print("❌ Some audio tests failed!")
-        print(f"📊 Ran {result.testsRun} tests")
-        print(f"❌ Failures: {len(result.failures)}")
-        print(f"💥 Errors: {len(result.errors)}")
+        print(f"📊 Ran {tests_run} tests")
+        print(f"❌ Failures: {len(failures)}")
+        print(f"💥 Errors: {len(errors)}")
         
         # Print detailed error information
-        if result.failures:
+        if failures:
             print("\n📋 Failures:")
-            for test, traceback in result.failures:
+            for test, traceback in failures:
                 print(f"   {test}: {traceback}")
         
-        if result.errors:
+        if errors:
             print("\n📋 Errors:")
-            for test, traceback in result.errors:
+            for test, traceback in errors:
                 print(f"   {test}: {traceback}")
     
-    return result.wasSuccessful()
+    return success
 
 def main():
     """Main test runner with command line options"""
@@ -395,10 +421,12 @@ def main():
     parser.add_argument('level', nargs='?', default='unit', 
                        choices=['unit', 'integration', 'all'],
                        help='Test level to run')
+    parser.add_argument('--jobs', type=int, default=1,
+                       help='Run test classes in this many worker processes')
     
     args = parser.parse_args()
     
-    success = run_audio_tests(args.level)
+    success = run_audio_tests(args.level, args.jobs)
     sys.exit(0 if success else 1)
 
 if __name__ == "__main__":
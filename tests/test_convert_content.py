@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Unit tests for convert_content.py
+Tests the in-memory conversion from user JSON to production data.
+"""
+
+import json
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+# Add scripts directory to path so we can import our module
+_SCRIPTS = os.path.normpath(os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+if _SCRIPTS not in sys.path:
+    sys.path.insert(0, _SCRIPTS)
+
+from convert_content import convert_user_to_production_data
+
+USER_JSON = Path(__file__).resolve().parent.parent / 'content' / 'teil1' / 'test-content' / 'test_user_input.json'
+
+def load_user_data():
+    """Fresh parse of the Teil 1 test content; the converter edits speakers in place"""
+    with open(USER_JSON, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+class TestConvertUserToProductionData(unittest.TestCase):
+
+    def test_section_order(self):
+        """Intro and instructions, then transition/task/answer per task, then the ending"""
+        production_data = convert_user_to_production_data(load_user_data())
+
+        expected_ids = ['intro', 'instructions']
+        for i in range(1, 6):
+            expected_ids += [f'transition_{i}', f'task_{i}', f'answer_{i}']
+        expected_ids += ['transition_end', 'outro']
+        self.assertEqual([section['id'] for section in production_data['sections']], expected_ids)
+
+    def test_answer_reveal_uses_correct_option(self):
+        """Answer sections carry the letter and option text of the correct answer"""
+        user_data = load_user_data()
+        production_data = convert_user_to_production_data(user_data)
+
+        question = user_data['questions'][0]
+        answer = next(s for s in production_data['sections'] if s['id'] == 'answer_1')
+        self.assertEqual(answer['correct_answer'], question['correct_answer'])
+        self.assertEqual(answer['answer_text'], question['options'][question['correct_answer']])
+
+    def test_missing_gender_is_detected(self):
+        """Speakers without a gender get one from their name; explicit genders are kept"""
+        user_data = load_user_data()
+        del user_data['content'][2]['speakers']['Trainer']['gender']
+        user_data['content'][4]['speakers']['Moderator']['gender'] = 'female'
+
+        production_data = convert_user_to_production_data(user_data)
+
+        self.assertEqual(production_data['content'][2]['speakers']['Trainer']['gender'], 'male')
+        self.assertEqual(production_data['content'][4]['speakers']['Moderator']['gender'], 'female')
+
+    def test_unsupported_teil_returns_none(self):
+        """Teile without a converter yield None instead of production data"""
+        user_data = load_user_data()
+        user_data['exam_info']['teil'] = 4
+
+        self.assertIsNone(convert_user_to_production_data(user_data))
+
+    def test_nothing_written_to_disk(self):
+        """The in-memory path leaves the working directory untouched"""
+        user_data = load_user_data()
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cwd = os.getcwd()
+            os.chdir(temp_dir)
+            try:
+                convert_user_to_production_data(user_data)
+            finally:
+                os.chdir(cwd)
+            self.assertEqual(os.listdir(temp_dir), [])
+
+if __name__ == '__main__':
+    unittest.main()
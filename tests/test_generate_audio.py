@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Unit tests for generate_audio.py
+Runs ConfigurableAudioGenerator.generate_all_audio with Polly and audio decoding stubbed out.
+"""
+
+import json
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+# Add scripts directory to path so we can import our module
+_SCRIPTS = os.path.normpath(os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+if _SCRIPTS not in sys.path:
+    sys.path.insert(0, _SCRIPTS)
+
+from generate_audio import ConfigurableAudioGenerator
+from teil_config_generator import TeilConfigManager
+
+PRODUCTION_JSON = (Path(__file__).resolve().parent.parent / 'content' / 'teil1'
+                   / 'production-ready' / 'test_user_input_production.json')
+
+# Every synthesized clip reports this length
+CLIP_DURATION = 2.0
+
+class TestGenerateAllAudio(unittest.TestCase):
+
+    def setUp(self):
+        """Work in a temp directory with the built-in Teil 1 defaults and no real Polly"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        cwd = os.getcwd()
+        os.chdir(self.temp_dir.name)
+        self.addCleanup(os.chdir, cwd)
+
+        config_manager = TeilConfigManager(config_dir=Path(self.temp_dir.name) / 'config')
+        for patcher in [
+            patch('generate_audio.get_polly_client', return_value=MagicMock()),
+            patch('generate_audio.get_config_manager', return_value=config_manager),
+            patch.object(ConfigurableAudioGenerator, 'generate_speech', return_value=b'fake-mp3'),
+            patch.object(ConfigurableAudioGenerator, 'get_audio_duration', return_value=CLIP_DURATION),
+        ]:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        with open(PRODUCTION_JSON, 'r', encoding='utf-8') as f:
+            self.production_data = json.load(f)
+
+    def test_dict_input_defaults_base_name(self):
+        """Parsed data has no file name, so the output goes to output/audio/production"""
+        audio_dir, _ = ConfigurableAudioGenerator().generate_all_audio(self.production_data)
+
+        self.assertEqual(audio_dir, Path('output/audio/production'))
+        self.assertTrue((audio_dir / 'audio_sequence.json').exists())
+        self.assertTrue((audio_dir / 'task_5.mp3').exists())
+
+    def test_dict_and_path_give_same_sequence(self):
+        """Passing the parsed dict builds the same sequence as passing its file"""
+        _, from_path = ConfigurableAudioGenerator().generate_all_audio(PRODUCTION_JSON)
+        _, from_dict = ConfigurableAudioGenerator().generate_all_audio(self.production_data, PRODUCTION_JSON.stem)
+
+        self.assertEqual(from_dict, from_path)
+
+    def test_task_timing_from_config(self):
+        """Combined tasks add the start buffer, both plays, the pause and thinking time"""
+        _, sequence_info = ConfigurableAudioGenerator().generate_all_audio(self.production_data)
+
+        tasks = [step for step in sequence_info['sequence'] if step['type'] == 'combined_task']
+        self.assertEqual(len(tasks), 5)
+        # 2.0s buffer + 2 × 2.0s text + 3.0s pause + 5.0s thinking time
+        self.assertEqual(tasks[0]['total_duration'], 14.0)
+
+        sequence = sequence_info['sequence']
+        for previous, step in zip(sequence, sequence[1:]):
+            previous_duration = previous.get('total_duration', previous.get('duration', 0))
+            self.assertAlmostEqual(step['start_time'], previous['start_time'] + previous_duration)
+        self.assertAlmostEqual(sequence_info['total_duration'],
+                               sequence[-1]['start_time'] + sequence[-1]['duration'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Unit tests for sync_audio_video.py
+Tests clip placement and the FFmpeg filter graph built from audio_sequence.json.
+"""
+
+import unittest
+import tempfile
+import os
+import sys
+from pathlib import Path
+
+# Add scripts directory to path so we can import our module
+_SCRIPTS = os.path.normpath(os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+if _SCRIPTS not in sys.path:
+    sys.path.insert(0, _SCRIPTS)
+
+from sync_audio_video import TimingRespectingAudioVideoSynchronizer
+
+class TestAudioPlacement(unittest.TestCase):
+
+    def setUp(self):
+        """Create an audio directory with empty placeholder clips"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.audio_dir = Path(self.temp_dir.name)
+        for name in ['intro.mp3', 'task_1.mp3', 'answer_1.mp3', 'outro.mp3']:
+            (self.audio_dir / name).touch()
+
+        self.audio_sequence = {
+            "total_duration": 60.0,
+            "sequence": [
+                {"type": "intro", "start_time": 0.0, "duration": 5.0},
+                {"type": "combined_task", "task_number": 1, "start_time": 5.0,
+                 "task_start_buffer": 2.0, "text_duration": 10.0, "play_count": 2,
+                 "pause_between": 3.0, "thinking_time": 5.0, "total_duration": 30.0},
+                {"type": "answer_reveal", "task_number": 1, "start_time": 35.0,
+                 "duration": 4.0, "pause_after": 3.0, "total_duration": 7.0},
+                {"type": "outro", "start_time": 42.0, "duration": 18.0}
+            ]
+        }
+        self.synchronizer = TimingRespectingAudioVideoSynchronizer()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_task_plays_twice_after_buffer(self):
+        """Second play starts after the first play plus the pause"""
+        placements = self.synchronizer.plan_audio_placements(self.audio_dir, self.audio_sequence)
+
+        task_starts = [start for audio_file, start in placements if audio_file.name == 'task_1.mp3']
+        self.assertEqual(task_starts, [7.0, 20.0])
+
+    def test_missing_files_are_skipped(self):
+        """Steps without an audio file on disk are left out of the mix"""
+        (self.audio_dir / 'outro.mp3').unlink()
+        placements = self.synchronizer.plan_audio_placements(self.audio_dir, self.audio_sequence)
+
+        self.assertNotIn('outro.mp3', [audio_file.name for audio_file, _ in placements])
+        self.assertEqual(len(placements), 4)
+
+    def test_consistent_sequence_has_no_timing_error(self):
+        """Steps that start exactly where the previous one ends pass validation"""
+        self.assertIsNone(self.synchronizer.find_timing_error(self.audio_sequence))
+
+    def test_timing_error_reports_offending_step(self):
+        """A step that starts late is reported with its index and offset"""
+        self.audio_sequence['sequence'][2]['start_time'] = 35.5
+        self.audio_sequence['sequence'][3]['start_time'] = 42.5
+
+        self.assertEqual(self.synchronizer.find_timing_error(self.audio_sequence), (3, 0.5))
+
+    def test_transition_uses_sequence_file(self):
+        """Transition steps carry no id, so their recorded file path is used"""
+        step = {"type": "transition", "start_time": 5.0,
+                "file": "output/audio/test/transition_transition_1.mp3"}
+        audio_file = self.synchronizer._resolve_step_file(step, self.audio_dir)
+
+        self.assertEqual(audio_file, self.audio_dir / 'transition_transition_1.mp3')
+
+    def test_filter_graph_deduplicates_inputs(self):
+        """Repeated clips are opened once and fanned out with asplit"""
+        placements = self.synchronizer.plan_audio_placements(self.audio_dir, self.audio_sequence)
+        input_files, filter_complex = self.synchronizer.build_audio_filter_graph(placements)
+
+        self.assertEqual([f.name for f in input_files],
+                         ['intro.mp3', 'task_1.mp3', 'answer_1.mp3', 'outro.mp3'])
+        self.assertIn("[2:a]aformat=sample_rates=22050:channel_layouts=mono,asplit=2[s2_0][s2_1]",
+                      filter_complex)
+        self.assertIn("[s2_1]adelay=delays=20000:all=1[p2]", filter_complex)
+        self.assertIn("[1:a]aformat=sample_rates=22050:channel_layouts=mono[f1]", filter_complex)
+        self.assertIn("[f1]adelay=delays=0:all=1[p0]", filter_complex)
+        self.assertTrue(filter_complex.endswith(
+            "[p0][p1][p2][p3][p4]amix=inputs=5:normalize=0:dropout_transition=0,apad[aout]"))
+
+if __name__ == '__main__':
+    unittest.main()